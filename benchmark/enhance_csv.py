@@ -0,0 +1,194 @@
+# coding=utf-8
+
+"""
+性能测试：csv读取工具包(utils.enhance_csv)
+运行方法: python -m benchmark.enhance_csv
+"""
+
+import csv
+import os
+import random
+import tempfile
+import tracemalloc
+
+from utils import enhance_csv
+from utils.gadget import Timer
+
+
+def random_csv(path, row_num=200000, column_num=10, seed=0):
+    """ 生成随机数据的测试csv文件
+    :param path: <str> 测试csv文件路径
+    :param row_num: <int> 数据行数(不含标题行)
+    :param column_num: <int> 列数
+    :param seed: <int> 随机数种子
+    :return: <list:str> 标题行
+    """
+    rng = random.Random(seed)
+    title = ["列" + str(j) for j in range(1, column_num + 1)]
+    with open(path, "w", encoding="UTF-8", newline="") as fw:
+        writer = csv.writer(fw)
+        writer.writerow(title)
+        for _ in range(row_num):
+            writer.writerow([rng.choice(["", str(rng.randint(0, 1000)), "文本"]) for _ in range(column_num)])
+    return title
+
+
+def get_data_list_before(path, column_name, iNn_Column_name):
+    """ 逐行调用some_value_is_none与get_some_value读取csv(RowProjection之前的读取方式)
+    :param path: <str> csv文件路径
+    :param column_name: <list> 需要读取的列的列名列表
+    :param iNn_Column_name: <list> 不允许为空值的列名列表
+    :return: <list> 读取结果
+    """
+    result = []
+    with enhance_csv.open_csv(path, encoding="UTF-8") as csv_file:
+        title = next(csv_file)
+        column_name_dict = enhance_csv.find_some_column(title, column_name)
+        not_none_column_name_list = enhance_csv.find_some_column(title, iNn_Column_name)
+        for tLine in csv_file:
+            if len(tLine) != len(title) or enhance_csv.some_value_is_none(tLine, not_none_column_name_list):
+                continue
+            result.append(enhance_csv.get_some_value(tLine, column_name, column_name_dict))
+    return result
+
+
+def bench_row_projection(row_num=200000):
+    """ 比较逐行字典查找与RowProjection的csv读取耗时
+    :param row_num: <int> 测试csv数据行数
+    """
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.csv")
+    title = random_csv(path, row_num)
+    column_name, not_none = title[1:6], title[6:8]
+
+    timer = Timer()
+    with enhance_csv.open_csv(path, encoding="UTF-8") as csv_file:
+        parse_num = sum(1 for _ in csv_file)
+    time_parse = timer.get(ms=True)
+
+    timer = Timer()
+    result_before = get_data_list_before(path, column_name, not_none)
+    time_before = timer.get(ms=True)
+
+    timer = Timer()
+    result_after = enhance_csv.get_data_list(path, column_name, encoding="UTF-8", iNn_Column_name=not_none)
+    time_after = timer.get(ms=True)
+
+    print("csv解析(%d行)=%.0fms; 解析+读取: 逐行字典查找=%.0fms(%.2fus/行), RowProjection=%.0fms(%.2fus/行), 结果一致=%s"
+          % (parse_num, time_parse, time_before, 1000 * (time_before - time_parse) / row_num, time_after,
+             1000 * (time_after - time_parse) / row_num, result_before == result_after))
+
+    # 只比较每行的筛选及读取耗时(不含csv解析)
+    with enhance_csv.open_csv(path, encoding="UTF-8") as csv_file:
+        title = next(csv_file)
+        line_list = list(csv_file)
+    column_name_dict = enhance_csv.find_some_column(title, column_name)
+    not_none_dict = enhance_csv.find_some_column(title, not_none)
+    timer = Timer()
+    for line in line_list:
+        if not enhance_csv.some_value_is_none(line, not_none_dict):
+            enhance_csv.get_some_value(line, column_name, column_name_dict)
+    time_before = timer.get(ms=True)
+    projection = enhance_csv.RowProjection(title, column_name, not_none)
+    timer = Timer()
+    for line in line_list:
+        if projection.check(line):
+            projection.get(line)
+    time_after = timer.get(ms=True)
+    print("每行筛选+读取: 逐行字典查找=%.3fus/行, RowProjection=%.3fus/行"
+          % (1000 * time_before / row_num, 1000 * time_after / row_num))
+    os.remove(path)
+
+
+def bench_parallel(row_num=1000000, processes=None):
+    """ 比较get_data_list与get_data_list_parallel的读取耗时
+    :param row_num: <int> 测试csv数据行数
+    :param processes: <int/None> 进程数量(默认为CPU核数)
+    """
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.csv")
+    title = random_csv(path, row_num)
+    column_name, not_none = title[1:6], title[6:8]
+
+    timer = Timer()
+    result_single = enhance_csv.get_data_list(path, column_name, encoding="UTF-8", iNn_Column_name=not_none)
+    time_single = timer.get(ms=True)
+
+    chunk_size = max(os.path.getsize(path) // (4 * (processes or os.cpu_count())), 1024 * 1024)
+    timer = Timer()
+    result_parallel = enhance_csv.get_data_list_parallel(path, column_name, encoding="UTF-8", iNn_Column_name=not_none,
+                                                         processes=processes, chunk_size=chunk_size)
+    time_parallel = timer.get(ms=True)
+
+    print("读取%d行(%d进程): 单进程=%.0fms, 多进程=%.0fms, 加速比=%.2f, 结果一致=%s"
+          % (row_num, processes or os.cpu_count(), time_single, time_parallel, time_single / time_parallel,
+             result_single == result_parallel))
+    os.remove(path)
+
+
+def bench_columns(row_num=200000):
+    """ 比较get_data_list与get_data_columns的读取耗时及内存峰值
+    :param row_num: <int> 测试csv数据行数
+    """
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.csv")
+    title = random_csv(path, row_num)
+    column_name = title[1:6]
+    dtype = {title[1]: "int", title[2]: "float", title[3]: "category", title[4]: "category", title[5]: "int"}
+
+    timer = Timer()
+    enhance_csv.get_data_list(path, column_name, encoding="UTF-8")
+    time_list = timer.get(ms=True)
+    timer = Timer()
+    enhance_csv.get_data_columns(path, column_name, dtype, encoding="UTF-8")
+    time_columns = timer.get(ms=True)
+
+    # 读取结果占用的内存(在tracemalloc下单独读取一次,避免其开销影响耗时)
+    tracemalloc.start()
+    result = enhance_csv.get_data_list(path, column_name, encoding="UTF-8")
+    memory_list = tracemalloc.get_traced_memory()[0]
+    del result
+    result = enhance_csv.get_data_columns(path, column_name, dtype, encoding="UTF-8")
+    memory_columns = tracemalloc.get_traced_memory()[0]
+    del result
+    tracemalloc.stop()
+
+    print("读取%d行*%d列: get_data_list=%.0fms(结果%.1fMB), get_data_columns=%.0fms(结果%.1fMB)"
+          % (row_num, len(column_name), time_list, memory_list / 1024 / 1024, time_columns,
+             memory_columns / 1024 / 1024))
+    os.remove(path)
+
+
+def bench_index(row_num=200000, lookup_num=1000):
+    """ 比较每次查询都通过get_data读取整个csv与通过CsvIndex查询的耗时
+    :param row_num: <int> 测试csv数据行数
+    :param lookup_num: <int> 查询次数
+    """
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.csv")
+    with open(path, "w", encoding="UTF-8", newline="") as fw:
+        writer = csv.writer(fw)
+        writer.writerow(["编号", "名称", "数量"])
+        for i in range(row_num):
+            writer.writerow(["K" + str(i), "名称" + str(i), str(i % 100)])
+    key_list = ["K" + str(i) for i in random.Random(0).sample(range(row_num), lookup_num)]
+
+    timer = Timer()
+    data = enhance_csv.get_data(path, ["编号"], ["名称", "数量"], encoding="UTF-8", classify_unique=True)
+    time_load = timer.get(ms=True)
+    timer = Timer()
+    index = enhance_csv.CsvIndex(path, ["编号"], ["名称", "数量"], encoding="UTF-8")
+    time_build = timer.get(ms=True)
+    index.close()
+    timer = Timer()
+    with enhance_csv.CsvIndex(path, ["编号"], ["名称", "数量"], encoding="UTF-8") as index:
+        result = [index.get(key) for key in key_list]
+    time_lookup = timer.get(ms=True)
+
+    print("%d行csv: get_data读取整个文件=%.0fms; CsvIndex生成索引=%.0fms, 打开索引并查询%d次=%.0fms, 结果一致=%s"
+          % (row_num, time_load, time_build, lookup_num, time_lookup, result == [data[key] for key in key_list]))
+    os.remove(path)
+    os.remove(path + ".index")
+
+
+if __name__ == "__main__":
+    bench_row_projection()
+    bench_parallel()
+    bench_columns()
+    bench_index()
@@ -0,0 +1,60 @@
+# coding=utf-8
+
+"""
+性能测试：Excel读写工具包(utils.enhance_openpyxl)
+运行方法: python -m benchmark.enhance_openpyxl
+"""
+
+import random
+
+from openpyxl import Workbook
+
+from utils import enhance_openpyxl
+from utils.gadget import Timer
+
+
+def random_sheet(row_num=1000, column_num=10, seed=0):
+    """ 生成随机数据的测试Sheet
+    :param row_num: <int> 数据行数(不含标题行)
+    :param column_num: <int> 列数
+    :param seed: <int> 随机数种子
+    :return: <openpyxl.worksheet.worksheet.Worksheet> 测试Sheet
+    """
+    rng = random.Random(seed)
+    sheet = Workbook().active
+    sheet.append(["列" + str(j) for j in range(1, column_num + 1)])
+    for _ in range(row_num):
+        sheet.append([rng.choice([rng.randint(0, 1000), "文本" + str(rng.randint(0, 99)), None])
+                      for _ in range(column_num)])
+    return sheet
+
+
+def bench_row_extractor(row_num=1000, column_num=10, title_num=5):
+    """ 比较逐行调用row_any_value_by_cn与RowExtractor的每行读取耗时
+    :param row_num: <int> 数据行数
+    :param column_num: <int> 列数
+    :param title_num: <int> 每行读取的列数
+    """
+    sheet = random_sheet(row_num, column_num)
+    title_list = ["列" + str(j) for j in range(column_num - title_num + 1, column_num + 1)]
+
+    timer = Timer()
+    result_before = [enhance_openpyxl.row_any_value_by_cn(sheet, 1, i, title_list) for i in range(2, row_num + 2)]
+    time_before = timer.get(ms=True)
+
+    timer = Timer()
+    extractor = enhance_openpyxl.RowExtractor.from_sheet(sheet, 1, title_list)
+    result_after = [extractor.row(sheet, i) for i in range(2, row_num + 2)]
+    time_after = timer.get(ms=True)
+
+    timer = Timer()
+    result_values = [extractor.values(row) for row in enhance_openpyxl.iter_row_values(sheet, min_row=2)]
+    time_values = timer.get(ms=True)
+
+    print("每行读取%d列: row_any_value_by_cn=%.2fus/行, RowExtractor.row=%.2fus/行, RowExtractor.values=%.2fus/行, "
+          "结果一致=%s" % (title_num, 1000 * time_before / row_num, 1000 * time_after / row_num,
+                        1000 * time_values / row_num, result_before == result_after == result_values))
+
+
+if __name__ == "__main__":
+    bench_row_extractor()
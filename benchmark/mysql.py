@@ -0,0 +1,71 @@
+# coding=utf-8
+
+"""
+性能测试：MySQL数据库支持函数(utils.mysql)
+需要可以写入的MySQL数据库,连接参数通过环境变量设置:MYSQL_HOST,MYSQL_USER,MYSQL_PASSWORD,MYSQL_DATABASE
+(LOAD DATA LOCAL INFILE还需要服务器设置local_infile=ON,否则load_csv会改为分块INSERT写入)
+运行方法: python -m benchmark.mysql
+"""
+
+import os
+import tempfile
+
+from benchmark.enhance_csv import random_csv
+from utils import enhance_csv
+from utils import mysql
+from utils.gadget import Timer
+
+# 测试使用的数据表(测试开始时创建,结束时删除)
+TABLE = "benchmark_load_csv"
+
+
+def bench_load_csv(host, user, password, database, row_num=200000):
+    """ 比较get_data_list+insert,get_data_list+insert_bulk与load_csv将csv写入MySQL数据表的耗时
+    :param host: <str> MySQL数据库主机的Url
+    :param user: <str> MySQL数据库的访问用户名
+    :param password: <str> MySQL数据库的访问密码
+    :param database: <str> MySQL数据库名称
+    :param row_num: <int> 测试csv数据行数
+    """
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.csv")
+    title = random_csv(path, row_num)
+    column_name = title[:5]
+    table_columns = ["c" + str(j) for j in range(1, len(column_name) + 1)]
+    create_sql = "CREATE TABLE " + TABLE + " (" + ",".join("`" + column + "` VARCHAR(32)"
+                                                           for column in table_columns) + ")"
+
+    def reset_table():
+        mysql.execute(host, user, password, database, "DROP TABLE IF EXISTS " + TABLE)
+        mysql.execute(host, user, password, database, create_sql)
+
+    result = []
+    reset_table()
+    timer = Timer()
+    data = [dict(zip(table_columns, row)) for row in enhance_csv.get_data_list(path, column_name, encoding="UTF-8")]
+    mysql.insert(host, user, password, database, TABLE, data)
+    result.append(("get_data_list+insert", timer.get(ms=True)))
+
+    reset_table()
+    timer = Timer()
+    mysql.load_csv(host, user, password, database, TABLE, path, column_name, table_columns, encoding="UTF-8",
+                   local_infile=False, console=False)
+    result.append(("load_csv(insert_bulk)", timer.get(ms=True)))
+
+    reset_table()
+    timer = Timer()
+    mysql.load_csv(host, user, password, database, TABLE, path, column_name, table_columns, encoding="UTF-8")
+    result.append(("load_csv(LOAD DATA)", timer.get(ms=True)))
+
+    mysql.execute(host, user, password, database, "DROP TABLE IF EXISTS " + TABLE)
+    os.remove(path)
+    print("写入%d行*%d列: " % (row_num, len(column_name)) +
+          ", ".join("%s=%.0fms(%.0f行/秒)" % (name, time_used, row_num / time_used * 1000)
+                    for name, time_used in result))
+
+
+if __name__ == "__main__":
+    if "MYSQL_HOST" not in os.environ:
+        print("[Warning] 未设置MySQL连接参数(环境变量MYSQL_HOST,MYSQL_USER,MYSQL_PASSWORD,MYSQL_DATABASE)")
+    else:
+        bench_load_csv(os.environ["MYSQL_HOST"], os.environ.get("MYSQL_USER", "root"),
+                       os.environ.get("MYSQL_PASSWORD", ""), os.environ.get("MYSQL_DATABASE", "test"))
@@ -0,0 +1,111 @@
+# coding=utf-8
+
+"""
+性能测试：图片处理工具包(utils.photoshop)
+运行方法: python -m benchmark.photoshop
+"""
+
+import numpy as np
+from PIL import Image
+
+from utils import photoshop
+from utils.gadget import Timer
+
+
+def random_image(width, height, level=32, seed=0):
+    """ 生成随机颜色的测试图片
+    :param width: <int> 图片宽度
+    :param height: <int> 图片高度
+    :param level: <int> 每个通道的取值数量(数量越少重复颜色越多)
+    :param seed: <int> 随机数种子
+    :return: <PIL.Image> 测试图片
+    """
+    rng = np.random.default_rng(seed)
+    array = (rng.integers(0, level, (height, width, 3)) * (256 // level)).astype(np.uint8)
+    return Image.fromarray(array, "RGB")
+
+
+def bench_color_folded(width=400, height=300):
+    """ 比较color_folded与color_folded_array的运行时间
+    :param width: <int> 测试图片宽度
+    :param height: <int> 测试图片高度
+    """
+    image = random_image(width, height)
+    for kwargs in [{}, {"posterize": 4, "percent": True}]:
+        timer = Timer()
+        result_pixel = photoshop.color_folded(image, **kwargs)
+        time_pixel = timer.get(ms=True)
+        timer = Timer()
+        result_array = photoshop.color_folded_array(image, **kwargs)
+        time_array = timer.get(ms=True)
+        print("color_folded %s: 逐点=%.1fms, 数组=%.1fms, 加速=%.1f倍, 结果一致=%s"
+              % (kwargs, time_pixel, time_array, time_pixel / time_array, result_pixel == result_array))
+
+
+def bench_color_count(width=400, height=300, color_num=(1, 20, 50), vague=8):
+    """ 比较color_count与color_count_array的吞吐量(百万像素/秒)
+    :param width: <int> 测试图片宽度
+    :param height: <int> 测试图片高度
+    :param color_num: <tuple:int> 测试使用的目标颜色数量
+    :param vague: <int> 颜色模糊程度
+    """
+    image = random_image(width, height)
+    megapixel = width * height / 1000000
+    rng = np.random.default_rng(1)
+    for num in color_num:
+        colors = [tuple(int(code) for code in rng.integers(0, 256, 3)) for _ in range(num)]
+        timer = Timer()
+        result_pixel = photoshop.color_count(image, *colors, vague=vague)
+        time_pixel = timer.get()
+        timer = Timer()
+        result_array = photoshop.color_count_array(image, *colors, vague=vague)
+        time_array = timer.get()
+        print("color_count %d色: 逐点=%.2fMP/s, 数组=%.2fMP/s, 结果一致=%s"
+              % (num, megapixel / time_pixel, megapixel / time_array, result_pixel == result_array))
+
+
+def bench_color_first(width=800, height=600):
+    """ 比较color_first与color_first_array在目标颜色不存在/位于右下角时的运行时间
+    :param width: <int> 测试图片宽度
+    :param height: <int> 测试图片高度
+    """
+    image = Image.new("RGB", (width, height), (240, 240, 240))
+    for name, position in [("不存在", None), ("右下角", (width - 10, height - 10))]:
+        if position is not None:
+            image.putpixel(position, (10, 20, 30))
+        timer = Timer()
+        result_pixel = photoshop.color_first(image, (10, 20, 30))
+        time_pixel = timer.get(ms=True)
+        for stride in [None, 8]:
+            timer = Timer()
+            result_array = photoshop.color_first_array(image, (10, 20, 30), stride=stride)
+            time_array = timer.get(ms=True)
+            print("color_first %s(stride=%s): 逐点=%.1fms, 数组=%.1fms, 结果一致=%s"
+                  % (name, stride, time_pixel, time_array, result_pixel == result_array))
+
+
+def bench_dcy_background(width=400, height=300, tile_height=64):
+    """ 比较dcy_background与dcy_background_array(整图/分块)的运行时间
+    :param width: <int> 测试图片宽度
+    :param height: <int> 测试图片高度
+    :param tile_height: <int> 分块处理时每块的高度
+    """
+    picture = random_image(width, height, level=256, seed=2)
+    background = random_image(width, height, level=256, seed=3)
+    photoshop.dcy_table()  # 查找表只需计算一次,不计入运行时间
+    timer = Timer()
+    result_pixel = np.asarray(photoshop.dcy_background(picture, background))
+    time_pixel = timer.get(ms=True)
+    for tile in [None, tile_height]:
+        timer = Timer()
+        result_array = np.asarray(photoshop.dcy_background_array(picture, background, tile_height=tile))
+        time_array = timer.get(ms=True)
+        print("dcy_background(tile_height=%s): 逐点=%.1fms, 数组=%.1fms, 结果一致=%s"
+              % (tile, time_pixel, time_array, bool((result_pixel == result_array).all())))
+
+
+if __name__ == "__main__":
+    bench_color_folded()
+    bench_color_count()
+    bench_color_first()
+    bench_dcy_background()
@@ -0,0 +1,89 @@
+# coding=utf-8
+
+"""
+图片处理工具包：图层混合模式(查找表实现)
+8位图片各通道只有256种取值,每种混合模式都可以预先计算为256*256的查找表,
+混合整张图片时每个像素的每个通道只需查表一次
+"""
+
+import functools
+
+import numpy as np
+from PIL import Image
+
+from utils import photoshop
+
+# 混合模式名称及其各点的RGB转换算法(第1个参数为基色,第2个参数为混合色)
+MODES = {
+    "partition": photoshop.mixed_mode_partition,  # 划分
+    "difference": photoshop.mixed_mode_difference,  # 差值
+    "multiply": photoshop.mixed_mode_multiply,  # 正片叠底
+    "screen": photoshop.mixed_mode_screen,  # 滤色
+    "overlay": photoshop.mixed_mode_overlay,  # 叠加
+    "hard_light": photoshop.mixed_mode_hard_light,  # 强光
+    "soft_light": photoshop.mixed_mode_soft_light,  # 柔光
+    "color_dodge": photoshop.mixed_mode_color_dodge,  # 颜色减淡
+    "color_burn": photoshop.mixed_mode_color_burn,  # 颜色加深
+    "linear_dodge": photoshop.mixed_mode_linear_dodge,  # 线性减淡(添加)
+    "linear_burn": photoshop.mixed_mode_linear_burn,  # 线性加深
+    "lighten": photoshop.mixed_mode_lighten,  # 变亮
+    "darken": photoshop.mixed_mode_darken,  # 变暗
+    "exclusion": photoshop.mixed_mode_exclusion,  # 排除
+    "subtract": photoshop.mixed_mode_subtract,  # 减去
+}
+
+
+@functools.lru_cache(maxsize=None)
+def table(mode):
+    """ 获取混合模式的查找表(每种混合模式只计算一次)
+    查找表的值由MODES中的转换算法逐个计算,并截断到0-255(与写入图片时的结果相同)
+    :param mode: <str> 混合模式名称,见MODES
+    :return: <numpy.ndarray> 形状为(256*256,)的uint8查找表,下标为:基色通道值*256+混合色通道值
+    """
+    function = MODES[mode]
+    result = np.array([min(max(function(code_1, code_2), 0), 255) for code_1 in range(256) for code_2 in range(256)],
+                      dtype=np.uint8)
+    result.flags.writeable = False
+    return result
+
+
+def apply_array(base, layer, mode):
+    """ 使用混合模式混合两个数组
+    :param base: <numpy.ndarray> 基色数组(uint8)
+    :param layer: <numpy.ndarray> 混合色数组(uint8,形状与基色数组相同)
+    :param mode: <str> 混合模式名称,见MODES
+    :return: <numpy.ndarray> 混合结果(uint8)
+    """
+    return table(mode)[(base.astype(np.intp) << 8) | layer]
+
+
+def apply(base, layer, mode, tile_height=None):
+    """ 使用混合模式混合两张图片(要求两张图片的宽高完全相同)
+    :param base: <PIL.Image> 基色图层
+    :param layer: <PIL.Image> 混合色图层
+    :param mode: <str> 混合模式名称,见MODES
+    :param tile_height: <int/None> 分块处理时每块的高度(行数):None=整张图片一次处理
+    :return: <PIL.Image> 混合结果(RGB模式),若两张图片的宽高不同则返回None
+    """
+    if mode not in MODES:
+        print("[Warning] 未知的混合模式(" + str(mode) + ")")
+        return None
+    width, height = base.size
+    if layer.size[0] != width or layer.size[1] != height:
+        return None
+    tile_height = height if tile_height is None else max(int(tile_height), 1)  # 每块至少1行
+    result = Image.new("RGB", base.size)
+    for top in range(0, height, tile_height):
+        box = (0, top, width, min(top + tile_height, height))
+        part = apply_array(photoshop.image_array(base.crop(box)), photoshop.image_array(layer.crop(box)), mode)
+        result.paste(Image.fromarray(part, "RGB"), box)
+    return result
+
+
+def posterize(image, level):
+    """ [图像-调整-色调分离](查找表实现,结果与逐点调用posterize_code相同)
+    :param image: <PIL.Image> 图片对象
+    :param level: <int> 色阶
+    :return: <PIL.Image> 色调分离后的图片(RGB模式)
+    """
+    return Image.fromarray(photoshop.posterize_table(level)[photoshop.image_array(image)], "RGB")
@@ -1,11 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import array
+import contextlib
 import csv
+import io
+import itertools
+import json
+import locale
+import multiprocessing
+import operator
+import os
+import sqlite3
+import urllib.request
 
 from utils import basic
 from utils import file as file
 
+# 并行读取时每个分块的字节数
+CHUNK_SIZE = 64 * 1024 * 1024
+
 
 def load(path, encoding=None):
     """ 加载csv文件
@@ -20,6 +34,26 @@ def load(path, encoding=None):
         print("未找到文件:" + path)
 
 
+@contextlib.contextmanager
+def open_csv(path, encoding=None):
+    """ 加载csv文件(上下文管理器,退出时关闭文件)
+    使用方法: with open_csv(path) as csv_file: ...
+    :param path: <str> 文件所在路径
+    :param encoding: <str> 文件编码格式
+    :return: <_csv.reader> csv格式的文件内容(若文件不存在则为None)
+    """
+    try:
+        csv_file = open(path, mode="r", encoding=encoding, newline="")
+    except FileNotFoundError:
+        print("未找到文件:" + path)
+        yield None
+        return
+    try:
+        yield csv.reader(csv_file)
+    finally:
+        csv_file.close()
+
+
 def find_column(title_list, aim_title):
     """ 在csv文件的标题行中找到目标列名对应的列坐标
     :param title_list: <list> csv的标题行
@@ -92,6 +126,159 @@ def get_some_value(line, column_name_list, column_name_dict, if_none=None):
         return get_value(line, column_name_list[0], column_name_dict, if_none=if_none)
 
 
+class RowProjection:
+    """
+    行数据投影:根据标题行预先计算需要读取的列坐标元组及不允许为空值的列坐标,
+    之后每行数据只需一次operator.itemgetter调用即可完成读取,一次元组查找即可完成空值判断
+    返回结果与get_some_value相同(读取超过一列返回list,读取一列返回该列的值,不存在的列为None)
+    构造方法:RowProjection(title, column_name, not_none_column_name)
+    使用方法:if projection.check(line): data_item = projection.get(line)
+    (check判断该行列数等于标题列数且不允许为空值的列不为空值)
+    """
+
+    def __init__(self, title, column_name, not_none_column_name=None, classify_column_name=None):
+        """
+        行数据投影:构造器
+        :param title: <list> csv的标题行
+        :param column_name: <list> 需要读取的列的列名列表
+        :param not_none_column_name: <list> 不允许为空值的列名列表(csv中不存在的列不做判断)
+        :param classify_column_name: <list> 分类列的列名列表(分类列也不允许为空值)
+        """
+        self.column_num = len(title)  # 标题行列数
+        self.index = [find_column(title, name) for name in column_name]  # 各读取列的列坐标(不存在的列为None)
+        self.classify_index = [find_column(title, name) for name in basic.not_null_list(classify_column_name)]
+        not_none_index = sorted({j for j in self.classify_index + [find_column(title, name) for name in
+                                                                  basic.not_null_list(not_none_column_name)]
+                                 if j is not None})
+        self.get = self._compile_get()
+        self.check = self._compile_check(not_none_index)
+        self.classify = operator.itemgetter(*self.classify_index) if self.classify_index else None
+
+    def _compile_get(self):
+        """ 生成读取一行数据的函数
+        :return: <function> 参数为一行数据(list),返回读取结果
+        """
+        if len(self.index) == 1:
+            if self.index[0] is None:
+                return lambda line: None
+            return operator.itemgetter(self.index[0])
+        if None in self.index:
+            # 存在不存在的列时,在行末尾追加None,使不存在的列读取为None
+            getter = operator.itemgetter(*[self.column_num if j is None else j for j in self.index])
+            return lambda line: list(getter(line + [None]))
+        getter = operator.itemgetter(*self.index)
+        return lambda line: list(getter(line))
+
+    def _compile_check(self, not_none_index):
+        """ 生成判断一行数据是否可以读取的函数(列数等于标题列数,且不允许为空值的列不为空值)
+        :param not_none_index: <list:int> 不允许为空值的列坐标列表
+        :return: <function> 参数为一行数据(list),返回是否可以读取:True=是,False=否
+        """
+        column_num = self.column_num
+        if len(not_none_index) == 0:
+            return lambda line: len(line) == column_num
+        if len(not_none_index) == 1:
+            j = not_none_index[0]
+            return lambda line: len(line) == column_num and line[j] != ""
+        getter = operator.itemgetter(*not_none_index)
+        return lambda line: len(line) == column_num and "" not in getter(line)
+
+    def classify_list(self, line):
+        """ 读取一行数据的各层分类
+        :param line: <list> csv的一行数据
+        :return: <list> 各层分类,例如: [一级分类,二级分类]
+        """
+        if len(self.classify_index) == 1:
+            return [self.classify(line)]
+        return list(self.classify(line))
+
+
+def iter_data(path, classify_column_name, column_name, encoding=None, console=False, not_none_column_name=None):
+    """ 流式读取整个csv表格每行中部分列的数据及其分类(每读取一行即返回一行,内存占用不随文件大小增长)
+    读取结束或生成器被关闭时自动关闭csv文件;数据校验规则与get_data相同
+    :param path: <str> csv文件路径地址
+    :param classify_column_name: <list> 分类列的列名列表,不能为空
+    :param column_name: <list> 需要读取的列的列名列表
+    :param encoding: <str> csv文件读取使用的编码格式
+    :param console: <bool> 是否将警告输出到控制台
+    :param not_none_column_name: <list> 不允许为空值的列名列表
+    :return: <generator> 依次返回:([一级分类,二级分类,...], 该行数据),该行数据的格式与get_data_list的每行结果相同
+    """
+    if not file.is_exist(path):
+        return
+    with open_csv(path, encoding=encoding) as csv_file:  # 读取csv文件
+        title = next(csv_file, None)  # 读取csv标题行
+        if title is None:
+            return
+        projection = RowProjection(title, column_name, not_none_column_name, classify_column_name)
+        for tLine in csv_file:
+            if not projection.check(tLine):
+                if console:
+                    _print_warning(path, projection, tLine)
+                continue
+            yield projection.classify_list(tLine), projection.get(tLine)
+
+
+def iter_data_list(path, column_name, encoding=None, console=False, iNn_Column_name=None):
+    """ 流式读取整个csv表格每行中部分列的数据(每读取一行即返回一行,内存占用不随文件大小增长)
+    读取结束或生成器被关闭时自动关闭csv文件;数据校验规则与get_data_list相同
+    :param path: <str> csv文件路径地址
+    :param column_name: <list> 需要读取的列的列名列表
+    :param encoding: <str> csv文件读取使用的编码格式
+    :param console: <bool> 是否将警告输出到控制台
+    :param iNn_Column_name: <list> 不允许为空值的列名列表
+    :return: <generator> 若读取超过一列,依次返回:[数据,数据];若读取一列,依次返回:数据
+    """
+    if not file.is_exist(path):
+        return
+    with open_csv(path, encoding=encoding) as csv_file:  # 读取csv文件
+        title = next(csv_file, None)  # 读取csv标题行
+        if title is None:
+            return
+        projection = RowProjection(title, column_name, iNn_Column_name)
+        if not console:  # 不输出警告时,筛选及读取全部在map/filter中完成
+            yield from map(projection.get, filter(projection.check, csv_file))
+            return
+        for tLine in csv_file:
+            if projection.check(tLine):
+                yield projection.get(tLine)
+            else:
+                _print_warning(path, projection, tLine)
+
+
+def _print_warning(path, projection, line):
+    """ 输出无法读取的行的警告信息
+    :param path: <str> csv文件路径地址
+    :param projection: <RowProjection> 读取csv使用的行数据投影
+    :param line: <list> 无法读取的行数据
+    :return: <None>
+    """
+    if len(line) != projection.column_num:
+        print("CSV文件读取警告:" + path + ",记录列数不等于标题列数,csv文件标题列数:" + str(projection.column_num) +
+              ",该行列数:" + str(len(line)))
+    else:
+        print("CSV文件读取警告:" + path + ",分类数据或不应为空值的数据为空值")
+
+
+def add_classify_item(result, classify_list, data_item, classify_unique=False):
+    """ 将一行数据按其分类添加到多层分类结果中(get_data的汇总过程)
+    :param result: <dict> 多层分类结果,形如get_data的返回结果
+    :param classify_list: <list> 该行数据的各层分类,例如: [一级分类,二级分类]
+    :param data_item: <object> 该行数据
+    :param classify_unique: <bool> 每个分类是否只需要唯一值
+    :return: <None>
+    """
+    classify = result
+    for classify_name in classify_list[:-1]:
+        if classify_name not in classify:
+            classify[classify_name] = {}
+        classify = classify[classify_name]
+    if classify_unique:
+        classify[classify_list[-1]] = data_item
+    else:
+        basic.add_dict_to_list(classify, classify_list[-1], data_item)
+
+
 def get_data(path, classify_column_name, column_name, encoding=None, console=False,
              classify_unique=False, not_none_column_name=None):
     """ 批量读取整个csv表格每行中部分列的数据,并依据其中的某些列(大于等于一列)对数据进行分类
@@ -108,36 +295,9 @@ def get_data(path, classify_column_name, column_name, encoding=None, console=Fal
     函数支持有超过两层分类,其中各层分类间的数据结构与以上结构相似,内层数据结构与get_sheet_in_classify的返回结果类似
     """
     result = {}
-    if not file.is_exist(path):
-        return result
-    csv_file = load(path, encoding=encoding)  # 读取csv文件
-    title = next(csv_file)  # 读取csv标题行
-    csv_len_column = len(title)  # 读取csv标题行列数
-    column_name_dict = find_some_column(title, column_name)
-    classify_column_name_list = find_some_column(title, classify_column_name)
-    not_none_column_name_list = find_some_column(title, not_none_column_name)
-    for tLine in csv_file:
-        if some_value_is_none(tLine, classify_column_name_list) or some_value_is_none(tLine, not_none_column_name_list):
-            if console:
-                print("CSV文件读取警告:" + path + ",分类数据或不应为空值的数据为空值")
-            continue
-        if len(tLine) != csv_len_column:
-            if console:
-                print(
-                    "CSV文件读取警告:" + path + ",记录列数不等于标题列数,csv文件标题列数:" + str(csv_len_column) + ",该行列数:" + str(len(tLine)))
-            continue
-        data_item = get_some_value(tLine, column_name, column_name_dict)
-        classify = result
-        for j in range(len(classify_column_name) - 1):
-            classify_name = tLine[classify_column_name_list[classify_column_name[j]]]
-            if classify_name not in classify:
-                classify[classify_name] = {}
-            classify = classify[classify_name]
-        last_classify_name = tLine[classify_column_name_list[classify_column_name[len(classify_column_name) - 1]]]
-        if classify_unique:
-            classify[last_classify_name] = data_item
-        else:
-            basic.add_dict_to_list(result, classify, data_item)
+    for classify_list, data_item in iter_data(path, classify_column_name, column_name, encoding=encoding,
+                                              console=console, not_none_column_name=not_none_column_name):
+        add_classify_item(result, classify_list, data_item, classify_unique)
     return result
 
 
@@ -152,22 +312,505 @@ def get_data_list(path, column_name, encoding=None, console=False, iNn_Column_na
     若读取超过一列,则结果按col_n_list中的顺序,返回:[[数据,数据],[数据,数据]]
     若读取一列,返回:[数据,数据]
     """
-    result = []
+    return list(iter_data_list(path, column_name, encoding=encoding, console=console,
+                               iNn_Column_name=iNn_Column_name))
+
+
+# 列式读取的整数数组(array类型q)可以保存的取值范围
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def parse_int(value):
+    """ 将csv单元格的文本解析为int格式(列式读取时使用)
+    与enhance_openpyxl.value_as_int(提取第一段连续数字)不同,本函数按完整文本解析数值
+    :param value: <str/None> 单元格的值
+    :return: <int> 整数内容;小数按截断取整,空值,非数值内容及超出64位整数范围的数值为0
+    """
+    try:
+        result = int(value)
+    except (TypeError, ValueError):
+        try:
+            result = int(float(value))
+        except (TypeError, ValueError, OverflowError):
+            return 0
+    if result < INT64_MIN or result > INT64_MAX:
+        return 0
+    return result
+
+
+def parse_float(value):
+    """ 将csv单元格的文本解析为float格式(列式读取时使用)
+    与enhance_openpyxl.value_as_float(提取第一段连续数字)不同,本函数按完整文本解析数值
+    :param value: <str/None> 单元格的值
+    :return: <float> 浮点数内容;空值及非数值内容为0.0
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class _CategoryCode(dict):
+    """
+    分类编码字典:查找不存在的值时自动分配新的编码(按首次出现的顺序从0开始)
+    """
+
+    def __missing__(self, key):
+        code = self[key] = len(self)
+        return code
+
+
+class _ConvertCache(dict):
+    """
+    转换结果缓存字典:查找不存在的值时调用转换函数并缓存结果(同一批数据中重复的值只转换一次)
+    """
+
+    def __init__(self, convert):
+        super().__init__()
+        self.convert = convert
+
+    def __missing__(self, key):
+        value = self[key] = self.convert(key)
+        return value
+
+
+# 列式读取支持的数据类型:类型名称 -> (array类型代码,转换函数)
+COLUMN_TYPES = {
+    "int": ("q", parse_int),
+    "float": ("d", parse_float),
+}
+
+
+def get_data_columns(path, column_name, dtype=None, encoding=None, console=False, iNn_Column_name=None,
+                     batch_size=65536, as_numpy=False):
+    """ 批量读取整个csv表格每行中部分列的数据,并按列返回(列式读取,读取行及数据校验规则与get_data_list相同)
+    数值列在读取时直接转换并写入紧凑的数组(每个单元格只占8字节),分类列只保存每个不同的值一次及各行的编码,
+    从而避免为每个单元格保存一个Python对象
+    :param path: <str> csv文件路径地址
+    :param column_name: <list> 需要读取的列的列名列表
+    :param dtype: <dict/None> 各列的数据类型,例如: {'数量': 'int', '金额': 'float', '平台': 'category'};
+    "int"=整数(array类型q,转换规则见parse_int),"float"=浮点数(array类型d,转换规则见parse_float),
+    "category"=分类(字典编码),"str"=字符串;未指定的列默认为"str"
+    :param encoding: <str> csv文件读取使用的编码格式
+    :param console: <bool> 是否将警告输出到控制台
+    :param iNn_Column_name: <list> 不允许为空值的列名列表
+    :param batch_size: <int> 每批转换的行数(每读取一批行数据即按列转换一次,内存占用不随文件大小增长)
+    :param as_numpy: <bool> 是否将数值列及分类编码返回为NumPy数组(与array.array共用内存,不会复制数据;需要安装numpy)
+    :return: <dict> 各列的读取结果,例如: {'数量': array('q', [数据,数据]), '平台': (array('i', [编码,编码]), [分类,分类]), ...}
+    数值列为array.array;分类列为(各行的编码数组, 各编码对应的值列表);字符串列为list:str;csv中不存在的列的值按None转换
+    """
+    dtype = dtype or {}
+    result = {}
+    column_list = []  # 各列的(列名,追加数据的方法,转换函数或分类编码字典)
+    for name in column_name:
+        column_type = dtype.get(name, "str")
+        if column_type in COLUMN_TYPES:
+            typecode, convert = COLUMN_TYPES[column_type]
+            result[name] = array.array(typecode)
+            column_list.append((name, result[name].extend, convert))
+        elif column_type == "category":
+            category_code = _CategoryCode()
+            result[name] = (array.array("i"), category_code)
+            column_list.append((name, result[name][0].extend, category_code))
+        else:
+            if column_type != "str":
+                print("[Warning] 未知的数据类型(" + str(column_type) + "),按str读取")
+            result[name] = []
+            column_list.append((name, result[name].extend, None))
+
+    row_list = iter_data_list(path, column_name, encoding=encoding, console=console, iNn_Column_name=iNn_Column_name)
+    while True:
+        batch = list(itertools.islice(row_list, batch_size))
+        if len(batch) == 0:
+            break
+        for j, (name, extend, convert) in enumerate(column_list):
+            values = batch if len(column_list) == 1 else map(operator.itemgetter(j), batch)
+            if convert is None:
+                extend(values)
+            elif isinstance(convert, _CategoryCode):
+                extend(map(convert.__getitem__, values))
+            else:  # 每批数据使用新的转换缓存,缓存大小不超过每批的行数
+                extend(map(_ConvertCache(convert).__getitem__, values))
+
+    for name, value in result.items():
+        if isinstance(value, tuple):  # 分类列:将编码字典转换为按编码排序的值列表
+            result[name] = (value[0], list(value[1]))
+    if as_numpy:
+        import numpy
+        for name, value in result.items():
+            if isinstance(value, array.array):
+                result[name] = numpy.frombuffer(value, dtype=value.typecode)
+            elif isinstance(value, tuple):
+                result[name] = (numpy.frombuffer(value[0], dtype=value[0].typecode), value[1])
+    return result
+
+
+def split_chunks(path, chunk_size=CHUNK_SIZE, block_size=16 * 1024 * 1024):
+    """ 将csv文件按字节拆分为若干分块,分块的边界均在记录结尾(换行符之后)
+    通过统计引号数量的奇偶判断换行符是否在引号内:引号内的换行符(单元格中的换行)不作为分块边界,
+    因此要求包含引号的单元格都用引号括起(csv.writer写入的文件均满足),且编码与ASCII兼容(例如UTF-8,GBK,不能为UTF-16)
+    :param path: <str> csv文件路径地址
+    :param chunk_size: <int> 每个分块的字节数(实际分块会延伸到其后的第一个记录结尾)
+    :param block_size: <int> 拆分时每次读取的字节数
+    :return: <tuple> (标题行结尾位置, [(分块开始位置,分块结束位置),...])
+    """
+    boundary_list = []
+    with open(path, "rb") as fr:
+        position = 0  # 当前读取块在文件中的开始位置
+        quote_odd = False  # 已统计内容中的引号数量是否为奇数
+        target = 0  # 下一个分块边界不早于该位置(第一个边界为标题行结尾)
+        while True:
+            block = fr.read(block_size)
+            if not block:
+                break
+            counted = 0  # 当前读取块中已统计引号的位置
+            i = max(target - position, 0)
+            while i < len(block):
+                j = block.find(b"\n", i)
+                if j < 0:
+                    break
+                if block.count(b'"', counted, j) % 2 == 1:
+                    quote_odd = not quote_odd
+                counted = j
+                if quote_odd:
+                    i = j + 1
+                else:
+                    boundary_list.append(position + j + 1)
+                    target = position + j + 1 + chunk_size
+                    i = target - position
+            if block.count(b'"', counted) % 2 == 1:
+                quote_odd = not quote_odd
+            position += len(block)
+    if len(boundary_list) == 0 or boundary_list[-1] < position:
+        boundary_list.append(position)
+    return boundary_list[0], list(zip(boundary_list[:-1], boundary_list[1:]))
+
+
+def _read_chunk(args):
+    """ 读取csv文件的一个分块中部分列的数据(并行读取在工作进程中执行的读取过程)
+    :param args: <tuple> (文件路径,分块开始位置,分块结束位置,编码格式,标题行,读取列,不允许为空值的列,分类列,是否输出警告)
+    :return: <list> 该分块的读取结果:未设置分类列时每个元素与get_data_list的每行结果相同,
+    设置分类列时每个元素为([一级分类,二级分类,...], 该行数据)
+    """
+    path, start, end, encoding, title, column_name, not_none_column_name, classify_column_name, console = args
+    with open(path, "rb") as fr:
+        fr.seek(start)
+        content = fr.read(end - start)
+    projection = RowProjection(title, column_name, not_none_column_name, classify_column_name)
+    csv_file = csv.reader(io.TextIOWrapper(io.BytesIO(content), encoding=encoding, newline=""))
+    if not console:
+        line_list = filter(projection.check, csv_file)
+    else:
+        line_list = []
+        for tLine in csv_file:
+            if projection.check(tLine):
+                line_list.append(tLine)
+            else:
+                _print_warning(path, projection, tLine)
+    if classify_column_name is None:
+        return list(map(projection.get, line_list))
+    return [(projection.classify_list(tLine), projection.get(tLine)) for tLine in line_list]
+
+
+def _iter_chunk_result(path, column_name, encoding, console, not_none_column_name, classify_column_name,
+                       processes, chunk_size):
+    """ 多进程读取csv文件的各个分块,并按分块在文件中的顺序依次返回各分块的读取结果
+    :param path: <str> csv文件路径地址
+    :param column_name: <list> 需要读取的列的列名列表
+    :param encoding: <str> csv文件读取使用的编码格式
+    :param console: <bool> 是否将警告输出到控制台
+    :param not_none_column_name: <list> 不允许为空值的列名列表
+    :param classify_column_name: <list/None> 分类列的列名列表
+    :param processes: <int/None> 进程数量(默认为CPU核数)
+    :param chunk_size: <int> 每个分块的字节数
+    :return: <generator> 依次返回各分块的读取结果,见_read_chunk
+    """
     if not file.is_exist(path):
-        return result
-    csv_file = load(path, encoding=encoding)  # 读取csv文件
-    title = next(csv_file)  # 读取csv标题行
-    csv_len_column = len(title)  # 读取csv标题行列数
-    column_name_dict = find_some_column(title, column_name)
-    not_none_column_name_list = find_some_column(title, iNn_Column_name)
-    for tLine in csv_file:
-        if some_value_is_none(tLine, not_none_column_name_list):
-            if console:
-                print("CSV文件读取警告:" + path + ",分类数据或不应为空值的数据为空值")
-            continue
-        if len(tLine) != csv_len_column:
-            if console:
-                print("CSV文件读取警告:" + path + ",记录列数不等于标题列数,csv文件标题列数:" + str(csv_len_column) + ",该行列数:" + str(len(tLine)))
-            continue
-        result.append(get_some_value(tLine, column_name, column_name_dict))
+        return
+    title_end, chunk_list = split_chunks(path, chunk_size)
+    with open(path, "rb") as fr:
+        title = next(csv.reader(io.TextIOWrapper(io.BytesIO(fr.read(title_end)), encoding=encoding, newline="")),
+                     None)
+    if title is None or len(chunk_list) == 0:
+        return
+    task_list = [(path, start, end, encoding, title, column_name, not_none_column_name, classify_column_name, console)
+                 for start, end in chunk_list]
+    with multiprocessing.Pool(min(processes or multiprocessing.cpu_count(), len(task_list))) as pool:
+        yield from pool.imap(_read_chunk, task_list)
+
+
+def get_data_parallel(path, classify_column_name, column_name, encoding=None, console=False,
+                      classify_unique=False, not_none_column_name=None, processes=None, chunk_size=CHUNK_SIZE):
+    """ 多进程批量读取整个csv表格每行中部分列的数据并分类(适用于较大的csv文件,返回结果与get_data相同)
+    文件按split_chunks拆分为若干分块,各工作进程读取并筛选分块中的数据,主进程按分块顺序汇总分类
+    注意:在Windows中调用本函数的脚本需要放在 if __name__ == "__main__": 之下
+    :param path: <str> csv文件路径地址
+    :param classify_column_name: <list> 依据某些列单元格的值对结果汇总,则填写这些列的列名,不能为空
+    :param column_name: <list> 需要读取的列的列名列表
+    :param encoding: <str> csv文件读取使用的编码格式(需要与ASCII兼容,见split_chunks)
+    :param console: <bool> 是否将警告输出到控制台
+    :param classify_unique: <bool> 每个分类是否只需要唯一值
+    :param not_none_column_name: <list> 不允许为空值的列名列表
+    :param processes: <int/None> 进程数量(默认为CPU核数)
+    :param chunk_size: <int> 每个分块的字节数
+    :return: <dict> 与get_data的返回结果相同
+    """
+    result = {}
+    for chunk_result in _iter_chunk_result(path, column_name, encoding, console, not_none_column_name,
+                                           basic.not_null_list(classify_column_name), processes, chunk_size):
+        for classify_list, data_item in chunk_result:
+            add_classify_item(result, classify_list, data_item, classify_unique)
+    return result
+
+
+def get_data_list_parallel(path, column_name, encoding=None, console=False, iNn_Column_name=None, processes=None,
+                           chunk_size=CHUNK_SIZE):
+    """ 多进程批量读取整个csv表格每行中部分列的数据(适用于较大的csv文件,返回结果与get_data_list相同)
+    文件按split_chunks拆分为若干分块,各工作进程读取并筛选分块中的数据,主进程按分块顺序合并结果
+    注意:在Windows中调用本函数的脚本需要放在 if __name__ == "__main__": 之下
+    :param path: <str> csv文件路径地址
+    :param column_name: <list> 需要读取的列的列名列表
+    :param encoding: <str> csv文件读取使用的编码格式(需要与ASCII兼容,见split_chunks)
+    :param console: <bool> 是否将警告输出到控制台
+    :param iNn_Column_name: <list> 不允许为空值的列名列表
+    :param processes: <int/None> 进程数量(默认为CPU核数)
+    :param chunk_size: <int> 每个分块的字节数
+    :return: <list> 与get_data_list的返回结果相同
+    """
+    result = []
+    for chunk_result in _iter_chunk_result(path, column_name, encoding, console, iNn_Column_name, None,
+                                           processes, chunk_size):
+        result.extend(chunk_result)
     return result
+
+
+def _iter_records(fr, encoding):
+    """ 从二进制csv文件的当前位置开始依次读取每条记录(引号内的换行不作为记录结尾,判断方法见split_chunks)
+    :param fr: <io.BufferedReader> 以二进制模式打开的csv文件
+    :param encoding: <str> csv文件的编码格式
+    :return: <generator> 依次返回:(记录在文件中的开始位置, 记录的文本内容)
+    """
+    position = fr.tell()
+    part_list = []
+    quote_odd = False
+    for line in fr:
+        part_list.append(line)
+        if line.count(b'"') % 2 == 1:
+            quote_odd = not quote_odd
+        if not quote_odd:
+            content = b"".join(part_list)
+            yield position, content.decode(encoding)
+            position += len(content)
+            part_list = []
+    if part_list:
+        yield position, b"".join(part_list).decode(encoding)
+
+
+class CsvIndex:
+    """
+    csv文件的磁盘索引:记录每行数据的分类(key)及其在csv文件中的字节位置,保存为sqlite数据库,
+    查询时只需读取并解析命中的行,而不必读取整个csv文件(适合在多个短时间运行的进程中查询同一个较大的csv文件)
+    csv文件被修改(修改时间或大小变化)或分类列/不允许为空值的列变化时,索引自动重新生成
+    读取行及数据校验规则与get_data相同,get的返回结果与get_data(classify_unique=True)中对应分类的值相同
+    构造方法:CsvIndex(path, classify_column_name, column_name)
+    查询方法:index.get(一级分类, 二级分类, ...) / index.get_all(一级分类, 二级分类, ...)
+    要求csv文件的编码与ASCII兼容,且以换行符(\n或\r\n)作为记录结尾
+    """
+
+    def __init__(self, path, classify_column_name, column_name, encoding=None, not_none_column_name=None,
+                 index_path=None):
+        """
+        csv文件的磁盘索引:构造器(若索引不存在或已经失效则生成索引)
+        :param path: <str> csv文件路径地址
+        :param classify_column_name: <list> 分类列的列名列表,不能为空
+        :param column_name: <list> 需要读取的列的列名列表
+        :param encoding: <str> csv文件读取使用的编码格式
+        :param not_none_column_name: <list> 不允许为空值的列名列表
+        :param index_path: <str/None> 索引文件路径(默认为csv文件路径+".index")
+        """
+        self.path = path
+        self.classify_column_name = basic.not_null_list(classify_column_name)
+        self.column_name = column_name
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.not_none_column_name = basic.not_null_list(not_none_column_name)
+        self.index_path = index_path or path + ".index"
+        self.file = None  # 以二进制模式打开的csv文件(首次查询时打开)
+        self.connection = None
+        self.projection = None
+        if not file.is_exist(path):
+            print("[Warning] 未找到csv文件(" + path + ")")
+            return
+        if not self.is_valid():
+            self.build()
+        self.connection = sqlite3.connect("file:" + urllib.request.pathname2url(os.path.abspath(self.index_path)) +
+                                          "?mode=ro", uri=True, check_same_thread=False)
+        title = json.loads(self._meta()["title"])
+        self.projection = RowProjection(title, column_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        if self.connection is None:
+            return 0
+        return self.connection.execute("SELECT COUNT(DISTINCT key) FROM line").fetchone()[0]
+
+    def __contains__(self, classify_list):
+        return self._offset_list(classify_list, limit=1) != []
+
+    def _info(self):
+        """ 获取判断索引是否有效的信息(csv文件状态及生成索引使用的参数)
+        :return: <dict> 索引信息,值均为str
+        """
+        stat = os.stat(self.path)
+        return {"mtime_ns": str(stat.st_mtime_ns), "size": str(stat.st_size), "encoding": self.encoding,
+                "classify": json.dumps(self.classify_column_name, ensure_ascii=False),
+                "not_none": json.dumps(self.not_none_column_name, ensure_ascii=False)}
+
+    def _meta(self, connection=None):
+        """ 读取索引中保存的信息
+        :param connection: <sqlite3.Connection/None> 索引数据库连接(默认为当前连接)
+        :return: <dict> 索引信息(包括_info中的各项及csv标题行title)
+        """
+        return dict((connection or self.connection).execute("SELECT name, value FROM meta").fetchall())
+
+    def is_valid(self):
+        """ 判断索引文件是否存在且与当前csv文件及参数一致
+        :return: <bool> 索引是否有效:True=是,False=否
+        """
+        if not file.is_exist(self.index_path):
+            return False
+        try:
+            with contextlib.closing(sqlite3.connect(self.index_path)) as connection:
+                return self._is_current(connection)
+        except sqlite3.Error:
+            return False
+
+    def _is_current(self, connection):
+        """ 判断索引数据库中保存的信息是否与当前csv文件及参数一致
+        :param connection: <sqlite3.Connection> 索引数据库连接
+        :return: <bool> 索引是否有效:True=是,False=否
+        """
+        try:
+            meta = self._meta(connection)
+        except sqlite3.OperationalError:  # 尚未生成索引(不存在meta表)
+            return False
+        return all(meta.get(name) == value for name, value in self._info().items())
+
+    def build(self, batch_size=65536):
+        """ 读取整个csv文件生成索引
+        在原索引数据库中通过一个事务重新生成(不替换索引文件,其他进程或CsvIndex打开的索引不受影响,
+        提交前其他连接仍读取原索引);多个进程同时生成时依次进行,之后的进程发现索引已经有效则不再重复生成
+        :param batch_size: <int> 每批写入索引的行数
+        :return: <int> 写入索引的行数(索引已经由其他进程生成时为0)
+        """
+        if file.is_exist(self.index_path):
+            try:
+                with contextlib.closing(sqlite3.connect(self.index_path)) as connection:
+                    connection.execute("PRAGMA schema_version")
+            except sqlite3.DatabaseError:  # 不是有效的sqlite数据库(例如写入时中断而损坏),删除后重新生成
+                print("[Warning] 索引文件损坏,重新生成(" + self.index_path + ")")
+                os.remove(self.index_path)
+        num = 0
+        with open(self.path, "rb") as fr, \
+                contextlib.closing(sqlite3.connect(self.index_path, timeout=60, isolation_level=None)) as connection:
+            connection.execute("BEGIN IMMEDIATE")  # 获取写锁,其他进程的生成过程需要等待本事务结束
+            try:
+                if self._is_current(connection):  # 等待写锁期间已经由其他进程生成
+                    connection.execute("ROLLBACK")
+                    return 0
+                info = self._info()
+                connection.execute("DROP TABLE IF EXISTS meta")
+                connection.execute("DROP TABLE IF EXISTS line")
+                connection.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)")
+                connection.execute("CREATE TABLE line (key TEXT, offset INTEGER)")
+                position = [0]  # 当前记录在csv文件中的开始位置
+
+                def iter_text():
+                    for offset, text in _iter_records(fr, self.encoding):
+                        position[0] = offset
+                        yield text
+
+                csv_file = csv.reader(iter_text())
+                title = next(csv_file, [])
+                projection = RowProjection(title, self.classify_column_name, self.not_none_column_name,
+                                           self.classify_column_name)
+                if None in projection.classify_index:
+                    print("[Warning] csv文件(" + self.path + ")中不存在分类列:" + str(self.classify_column_name))
+                else:
+                    batch = []
+                    for tLine in csv_file:
+                        if not projection.check(tLine):
+                            continue
+                        batch.append((json.dumps(projection.classify_list(tLine), ensure_ascii=False), position[0]))
+                        if len(batch) >= batch_size:
+                            connection.executemany("INSERT INTO line VALUES (?, ?)", batch)
+                            num += len(batch)
+                            batch = []
+                    connection.executemany("INSERT INTO line VALUES (?, ?)", batch)
+                    num += len(batch)
+                connection.execute("CREATE INDEX line_key ON line (key, offset)")
+                info["title"] = json.dumps(title, ensure_ascii=False)
+                connection.executemany("INSERT INTO meta VALUES (?, ?)", info.items())
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return num
+
+    def _offset_list(self, classify_list, limit=None):
+        """ 查询分类对应的各行在csv文件中的字节位置
+        :param classify_list: <tuple/list> 各层分类,例如: (一级分类, 二级分类)
+        :param limit: <int/None> 最多返回的数量(从最后一行开始);None=返回全部
+        :return: <list:int> 各行的字节位置,limit为None时按行顺序排序,否则按行顺序倒序排序
+        """
+        if self.connection is None:
+            return []
+        key = json.dumps([str(item) for item in classify_list], ensure_ascii=False)
+        if limit is None:
+            cursor = self.connection.execute("SELECT offset FROM line WHERE key = ? ORDER BY offset", (key,))
+        else:
+            cursor = self.connection.execute("SELECT offset FROM line WHERE key = ? ORDER BY offset DESC LIMIT ?",
+                                             (key, limit))
+        return [row[0] for row in cursor]
+
+    def _read_line(self, offset):
+        """ 读取并解析csv文件中指定字节位置的一行数据
+        :param offset: <int> 该行在csv文件中的开始位置
+        :return: <object> 该行数据的读取结果(格式与get_data_list的每行结果相同)
+        """
+        if self.file is None:
+            self.file = open(self.path, "rb")
+        self.file.seek(offset)
+        return self.projection.get(next(csv.reader([next(_iter_records(self.file, self.encoding))[1]])))
+
+    def get(self, *classify_list):
+        """ 查询分类对应的数据(若同一分类有多行数据,返回最后一行,与get_data(classify_unique=True)相同)
+        :param classify_list: 各层分类,例如: index.get(一级分类, 二级分类)
+        :return: <object/None> 该行数据的读取结果,若分类不存在则返回None
+        """
+        offset_list = self._offset_list(classify_list, limit=1)
+        if len(offset_list) == 0:
+            return None
+        return self._read_line(offset_list[0])
+
+    def get_all(self, *classify_list):
+        """ 查询分类对应的所有数据(与get_data(classify_unique=False)中对应分类的值相同)
+        :param classify_list: 各层分类,例如: index.get_all(一级分类, 二级分类)
+        :return: <list> 各行数据的读取结果,按行顺序排序,若分类不存在则返回空列表
+        """
+        return [self._read_line(offset) for offset in self._offset_list(classify_list)]
+
+    def close(self):
+        """ 关闭csv文件及索引数据库连接
+        :return: <None>
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -1,8 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import array
+import collections
+import contextlib
 import copy
+import hashlib
+import itertools
+import multiprocessing
+import operator
+import os
+import pickle
 import re
+import weakref
 
 from openpyxl import Workbook
 from openpyxl import load_workbook
@@ -12,6 +22,9 @@ from openpyxl.utils.exceptions import InvalidFileException
 
 from utils import basic
 
+# 各Sheet的单元格值索引(见cell_index),Sheet对象被回收时索引自动删除
+_cell_index_cache = weakref.WeakKeyDictionary()
+
 
 def load(path, read_only=False, data_only=False, must_exist=False):
     """ 加载Excel文件
@@ -35,32 +48,69 @@ def load(path, read_only=False, data_only=False, must_exist=False):
             print("[Warning] 目标文件不是Excel文件(" + path + ")")
 
 
-def load_sheet(path, sheet_name=None, read_only=False, data_only=False, must_exist=True):
+def load_sheet(path, sheet_name=None, read_only=False, data_only=False, must_exist=True, deep_copy=True):
     """ 加载指定Excel文件中的指定Sheet
     :param path: <str> 要加载的Excel文件的地址路径
     :param sheet_name: <str/None> 要加载Sheet的名称,若为None则返回当前active的Sheet
     :param read_only: <bool> 是否开启只读模式(默认为False)
     :param data_only: <bool> 是否只读取数据,即只提取公式结果而不提取公式(默认为False)
     :param must_exist: <bool> 在Excel文件及Sheet不存在/不是Excel文件时的处理方案:True=退出程序,False=返回None(默认为True)
+    :param deep_copy: <bool> 是否复制Sheet后关闭Excel文件(默认为True);
+    False=直接返回Sheet而不复制(Excel文件保持打开,由Sheet的parent引用,只需加载一次且不额外占用内存),
+    若需要在使用完成后及时关闭Excel文件(尤其是只读模式),请使用open_sheet
     :return: <openpyxl.worksheet.worksheet.Worksheet> Openpyxl的Sheet对象
     """
     excel = load(path, read_only=read_only, data_only=data_only, must_exist=must_exist)
     if excel is None:
         return None
-    if sheet_name is None:
-        result = copy.deepcopy(excel.active)
+    sheet = _select_sheet(excel, path, sheet_name, must_exist)
+    if sheet is None or not deep_copy:
+        if sheet is None:
+            excel.close()
+        return sheet
+    result = copy.deepcopy(sheet)
+    excel.close()
+    return result
+
+
+@contextlib.contextmanager
+def open_sheet(path, sheet_name=None, read_only=False, data_only=False, must_exist=True):
+    """ 加载指定Excel文件中的指定Sheet(上下文管理器,不复制Sheet,退出时关闭Excel文件)
+    使用方法: with open_sheet(path, "Sheet1", read_only=True) as sheet: ...
+    :param path: <str> 要加载的Excel文件的地址路径
+    :param sheet_name: <str/None> 要加载Sheet的名称,若为None则返回当前active的Sheet
+    :param read_only: <bool> 是否开启只读模式(默认为False)
+    :param data_only: <bool> 是否只读取数据,即只提取公式结果而不提取公式(默认为False)
+    :param must_exist: <bool> 在Excel文件及Sheet不存在/不是Excel文件时的处理方案:True=退出程序,False=返回None(默认为True)
+    :return: <openpyxl.worksheet.worksheet.Worksheet> Openpyxl的Sheet对象(Excel文件或Sheet不存在时为None)
+    """
+    excel = load(path, read_only=read_only, data_only=data_only, must_exist=must_exist)
+    if excel is None:
+        yield None
+        return
+    try:
+        yield _select_sheet(excel, path, sheet_name, must_exist)
+    finally:
         excel.close()
-        return result
+
+
+def _select_sheet(excel, path, sheet_name, must_exist):
+    """ 在已加载的Excel文件中选择指定Sheet(load_sheet与open_sheet的Sheet选择过程)
+    :param excel: <openpyxl.workbook.workbook.Workbook> Openpyxl的Excel文件对象
+    :param path: <str> Excel文件的地址路径(用于输出错误信息)
+    :param sheet_name: <str/None> 要加载Sheet的名称,若为None则返回当前active的Sheet
+    :param must_exist: <bool> 在Sheet不存在时的处理方案:True=退出程序,False=返回None
+    :return: <openpyxl.worksheet.worksheet.Worksheet> Openpyxl的Sheet对象
+    """
+    if sheet_name is None:
+        return excel.active
     if sheet_name in excel.sheetnames:
-        result = copy.deepcopy(excel[sheet_name])
+        return excel[sheet_name]
+    if must_exist:
         excel.close()
-        return result
+        basic.sys_exit("[Error] 未在Excel文件中找到对应Sheet(" + path + "," + sheet_name + ")")
     else:
-        excel.close()
-        if must_exist:
-            basic.sys_exit("[Error] 未在Excel文件中找到对应Sheet(" + path + "," + sheet_name + ")")
-        else:
-            print("[Warning] 未在Excel文件中找到对应Sheet(" + path + ":" + sheet_name + ")")
+        print("[Warning] 未在Excel文件中找到对应Sheet(" + path + ":" + sheet_name + ")")
 
 
 def check_sheet(excel, name_list):
@@ -95,6 +145,149 @@ def compare_sheet(sheet_1, sheet_2, compare_row=True, compare_column=True, title
                 return False
 
 
+def diff_sheet(path_1, path_2, sheet_name=None, key_column=None, title_rn=1):
+    """ 比较两个Excel文件中同名Sheet的数据差异(以只读模式按行遍历,不会将Sheet读入内存)
+    不指定主键列时按行坐标逐行比较,内存占用只取决于差异的数量;
+    指定主键列时按主键匹配记录(记录顺序可以不同),需要在内存中保存两个Sheet中每条记录的主键(及第1个Sheet中记录的哈希值),
+    内存占用与记录数成正比(但不保存记录的值);主键重复的记录不参与比较,其主键在key_duplicated中单独返回
+    :param path_1: <str> 第1个(旧版本)Excel文件的地址路径
+    :param path_2: <str> 第2个(新版本)Excel文件的地址路径
+    :param sheet_name: <str/None> 需要比较的Sheet名称,若为None则比较两个文件当前active的Sheet
+    :param key_column: <str/list/None> 主键列的列名(或列名列表),None=按行坐标比较
+    :param title_rn: <int> 列名所在的行坐标(仅在指定主键列时使用,标题行之前的行不参与比较)
+    :return: <dict> 比较结果,例如:
+    {"sheet": Sheet名称, "inserted": [(行坐标或主键, 行数据),...], "deleted": [(行坐标或主键, 行数据),...],
+     "changed": [(行坐标或主键, [(列坐标或列名, 旧值, 新值),...]),...]}
+    按主键比较时额外返回: "column_inserted": [新增的列名,...], "column_deleted": [删除的列名,...],
+    "key_duplicated": [在任意一个Sheet中重复的主键,...](按首次出现的顺序)
+    """
+    with open_sheet(path_1, sheet_name, read_only=True, data_only=True) as sheet_1, \
+            open_sheet(path_2, sheet_name, read_only=True, data_only=True) as sheet_2:
+        if key_column is None:
+            result = _diff_sheet_by_line(sheet_1, sheet_2)
+        else:
+            result = _diff_sheet_by_key(sheet_1, sheet_2, [key_column] if isinstance(key_column, str) else key_column,
+                                        title_rn)
+        result["sheet"] = sheet_2.title
+    return result
+
+
+def _diff_sheet_by_line(sheet_1, sheet_2):
+    """ 按行坐标逐行比较两个Sheet的数据差异(diff_sheet的比较过程)
+    :param sheet_1: <openpyxl.worksheet.worksheet.Worksheet> 第1个(旧版本)Sheet对象
+    :param sheet_2: <openpyxl.worksheet.worksheet.Worksheet> 第2个(新版本)Sheet对象
+    :return: <dict> 比较结果,见diff_sheet
+    """
+    result = {"inserted": [], "deleted": [], "changed": []}
+    rows = itertools.zip_longest(iter_row_values(sheet_1), iter_row_values(sheet_2))
+    for i, (row_1, row_2) in enumerate(rows, start=1):
+        if row_1 == row_2:
+            continue
+        if row_1 is None:
+            result["inserted"].append((i, list(row_2)))
+        elif row_2 is None:
+            result["deleted"].append((i, list(row_1)))
+        else:
+            cells = [(j, value_1, value_2) for j, (value_1, value_2) in
+                     enumerate(itertools.zip_longest(row_1, row_2), start=1) if value_1 != value_2]
+            if cells:
+                result["changed"].append((i, cells))
+    return result
+
+
+def _diff_sheet_by_key(sheet_1, sheet_2, key_column, title_rn=1):
+    """ 按主键匹配记录比较两个Sheet的数据差异(diff_sheet的比较过程)
+    第1遍遍历第1个Sheet,只保存每条记录主键对应的哈希值;第2遍遍历第2个Sheet找出新增及哈希值不同的记录;
+    若存在修改或删除的记录,第3遍遍历第1个Sheet读取这些记录的旧值;
+    在任意一个Sheet中重复的主键无法确定记录的对应关系,这些主键的所有记录都不参与比较,只在key_duplicated中返回
+    :param sheet_1: <openpyxl.worksheet.worksheet.Worksheet> 第1个(旧版本)Sheet对象
+    :param sheet_2: <openpyxl.worksheet.worksheet.Worksheet> 第2个(新版本)Sheet对象
+    :param key_column: <list> 主键列的列名列表
+    :param title_rn: <int> 列名所在的行坐标
+    :return: <dict> 比较结果,见diff_sheet
+    """
+    title_1 = next(iter_row_values(sheet_1, min_row=title_rn, max_row=title_rn), ())
+    title_2 = next(iter_row_values(sheet_2, min_row=title_rn, max_row=title_rn), ())
+    column_list = [title for title in title_1 if title is not None and title in title_2]  # 两个Sheet共有的列
+    extractor_1 = RowExtractor(column_list, find_some_column_in_row(sheet_1, title_1, column_list))
+    extractor_2 = RowExtractor(column_list, find_some_column_in_row(sheet_2, title_2, column_list))
+    find_some_column_in_row(sheet_1, title_1, key_column)  # 主键列必须在两个Sheet中都存在
+    find_some_column_in_row(sheet_2, title_2, key_column)
+    key_index = [column_list.index(title) for title in key_column]
+
+    def records(sheet, extractor):
+        for row in iter_row_values(sheet, min_row=title_rn + 1):
+            values = extractor.values(row)
+            if len(column_list) == 1:
+                values = [values]
+            yield tuple(values[k] for k in key_index), values
+
+    def digest(values):
+        return hashlib.blake2b(repr(values).encode("UTF-8"), digest_size=16).digest()
+
+    duplicated = {}  # 重复的主键(使用dict保持首次出现的顺序)
+    hash_1 = {}
+    for key, values in records(sheet_1, extractor_1):
+        if key in hash_1:
+            duplicated[key] = None
+        hash_1[key] = digest(values)
+    result = {"inserted": [], "deleted": [], "changed": [],
+              "column_inserted": [title for title in title_2 if title is not None and title not in title_1],
+              "column_deleted": [title for title in title_1 if title is not None and title not in title_2]}
+    changed = {}  # 哈希值不同的记录的新值
+    key_set_2 = set()  # 第2个Sheet中已经出现的主键
+    for key, values in records(sheet_2, extractor_2):
+        if key in key_set_2:
+            duplicated[key] = None
+            continue
+        key_set_2.add(key)
+        if key not in hash_1:
+            result["inserted"].append((key, values))
+            continue
+        if hash_1.pop(key) != digest(values):
+            changed[key] = values
+    result["key_duplicated"] = list(duplicated)
+    if duplicated:  # 重复的主键不参与比较
+        result["inserted"] = [item for item in result["inserted"] if item[0] not in duplicated]
+        for key in duplicated:
+            changed.pop(key, None)
+            hash_1.pop(key, None)
+    if changed or hash_1:
+        for key, values in records(sheet_1, extractor_1):
+            if key in changed:
+                cells = [(column_list[j], values[j], changed[key][j]) for j in range(len(column_list))
+                         if values[j] != changed[key][j]]
+                result["changed"].append((key, cells))
+            elif key in hash_1:
+                result["deleted"].append((key, values))
+    return result
+
+
+def diff_workbook(path_1, path_2, key_column=None, title_rn=1, processes=None):
+    """ 比较两个Excel文件中所有同名Sheet的数据差异,每个Sheet由一个进程比较
+    注意:在Windows中调用本函数的脚本需要放在 if __name__ == "__main__": 之下
+    :param path_1: <str> 第1个(旧版本)Excel文件的地址路径
+    :param path_2: <str> 第2个(新版本)Excel文件的地址路径
+    :param key_column: <str/list/None> 主键列的列名(或列名列表),None=按行坐标比较,见diff_sheet
+    :param title_rn: <int> 列名所在的行坐标
+    :param processes: <int/None> 进程数量(默认为CPU核数)
+    :return: <dict> 比较结果,例如:
+    {"sheet_inserted": [新增的Sheet名称,...], "sheet_deleted": [删除的Sheet名称,...],
+     "sheets": {Sheet名称: diff_sheet的比较结果,...}}
+    """
+    excel_1 = load(path_1, read_only=True, must_exist=True)
+    excel_2 = load(path_2, read_only=True, must_exist=True)
+    name_1, name_2 = excel_1.sheetnames, excel_2.sheetnames
+    excel_1.close()
+    excel_2.close()
+    name_list = [name for name in name_1 if name in name_2]
+    with multiprocessing.Pool(processes) as pool:
+        diff_list = pool.starmap(diff_sheet, [(path_1, path_2, name, key_column, title_rn) for name in name_list])
+    return {"sheet_inserted": [name for name in name_2 if name not in name_1],
+            "sheet_deleted": [name for name in name_1 if name not in name_2],
+            "sheets": dict(zip(name_list, diff_list))}
+
+
 def create_with_sheet(sheet_list):
     """ 创建一个空Excel工作簿并包含指定Sheet
     :param sheet_list: <list> 创建的工作簿包含的Sheet名称列表
@@ -235,10 +428,7 @@ def cell_as_str(sheet, row, column):
     :param column: <object> 若单元格为空时返回的结果
     :return: <str> 转换为str格式的单元格内容
     """
-    if is_none(sheet, row=row, column=column):
-        return ""
-    else:
-        return str(sheet.cell(row=row, column=column).value)
+    return value_as_str(sheet.cell(row=row, column=column).value)
 
 
 def cell_as_int(sheet, row, column):
@@ -248,7 +438,35 @@ def cell_as_int(sheet, row, column):
     :param column: <object> 若单元格为空时返回的结果
     :return: <int> 转换为int格式的单元格内容
     """
-    value = sheet.cell(row=row, column=column).value
+    return value_as_int(sheet.cell(row=row, column=column).value)
+
+
+def cell_as_float(sheet, row, column):
+    """ 读取单元格内容,并将单元格内的值转换为float格式(若单元格内容不是数值,则使用正则表达式提取其中的数值部分转换)
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取的单元格所在Sheet对象
+    :param row: <int> 需要读取单元格所在的行
+    :param column: <object> 若单元格为空时返回的结果
+    :return: <float> 转换为float格式的单元格内容
+    """
+    return value_as_float(sheet.cell(row=row, column=column).value)
+
+
+def value_as_str(value):
+    """ 将单元格的值转换为str格式(转换规则与cell_as_str相同)
+    :param value: <object> 单元格的值
+    :return: <str> 转换为str格式的单元格内容(空单元格为"")
+    """
+    if value is None:
+        return ""
+    else:
+        return str(value)
+
+
+def value_as_int(value):
+    """ 将单元格的值转换为int格式(转换规则与cell_as_int相同)
+    :param value: <object> 单元格的值
+    :return: <int> 转换为int格式的单元格内容
+    """
     if value is None:
         return 0
     if isinstance(value, int):
@@ -260,14 +478,11 @@ def cell_as_int(sheet, row, column):
     return 0
 
 
-def cell_as_float(sheet, row, column):
-    """ 读取单元格内容,并将单元格内的值转换为float格式(若单元格内容不是数值,则使用正则表达式提取其中的数值部分转换)
-    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取的单元格所在Sheet对象
-    :param row: <int> 需要读取单元格所在的行
-    :param column: <object> 若单元格为空时返回的结果
+def value_as_float(value):
+    """ 将单元格的值转换为float格式(转换规则与cell_as_float相同)
+    :param value: <object> 单元格的值
     :return: <float> 转换为float格式的单元格内容
     """
-    value = sheet.cell(row=row, column=column).value
     if value is None:
         return float(0)
     if isinstance(value, float):
@@ -276,24 +491,55 @@ def cell_as_float(sheet, row, column):
         return float(value)
     if re.search("[0-9]+", str(value)) is not None:
         return float(re.search("[0-9]+", str(value)).group())
-    if re.search("[0-9]+\.[0-9]+", str(value)) is not None:
+    if re.search("[0-9]+\\.[0-9]+", str(value)) is not None:
         return float(re.search("[0-9]+", str(value)).group())
     return float(0)
 
 
-def find_cell(sheet, search_value):
+def find_cell(sheet, search_value, use_index=False):
     """ 查找指定值的单元格,并返回单元格的行列坐标
     仅会返回查找到的第一个符合查找条件的单元格的行列坐标，在查找时优先按行查找（即完整查完一行后才会开始查找下一行）
     :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要查找的单元格的Sheet对象
     :param search_value: <object> 查找单元格的值
+    :param use_index: <bool> 是否使用单元格值索引(默认为False);True=首次查找时遍历一次Sheet生成索引,
+    之后对同一Sheet的查找只需查询索引(适合对同一Sheet多次查找);
+    通过write_row,write_column写入数据时索引会自动失效,直接修改单元格后需要调用drop_cell_index
     :return: <int> , <int> 返回查找到的单元格的行列坐标,若没有查找到则返回None
     """
+    if use_index:
+        try:
+            return cell_index(sheet).get(search_value)
+        except TypeError:  # 查找的值无法作为索引的key(例如list),不可能与任何单元格的值相等
+            return None
     for i in range(1, sheet.max_row + 1):
         for j in range(1, sheet.max_column + 1):
             if sheet.cell(row=i, column=j).value is not None and sheet.cell(row=i, column=j).value == search_value:
                 return i, j
 
 
+def cell_index(sheet):
+    """ 获取Sheet的单元格值索引(若索引不存在则遍历一次Sheet生成)
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要生成索引的Sheet对象
+    :return: <dict> 单元格的值对应的行列坐标,每个值只记录按行优先顺序第一次出现的单元格,例如: {'平台':(1,1)}
+    """
+    if sheet not in _cell_index_cache:
+        index = {}
+        for i, row in enumerate(iter_row_values(sheet), start=1):
+            for j, value in enumerate(row, start=1):
+                if value is not None and value not in index:
+                    index[value] = (i, j)
+        _cell_index_cache[sheet] = index
+    return _cell_index_cache[sheet]
+
+
+def drop_cell_index(sheet):
+    """ 使Sheet的单元格值索引失效(修改Sheet中单元格的值后调用,下次使用索引查找时重新生成)
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要使索引失效的Sheet对象
+    :return: <None>
+    """
+    _cell_index_cache.pop(sheet, None)
+
+
 def column_total_value(sheet, col_n):
     """ 批量读取Excel表单中的一列数据
     :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取数据的Sheet对象
@@ -302,10 +548,59 @@ def column_total_value(sheet, col_n):
     """
     if col_n > sheet.max_column:
         return None
-    column_value = []
-    for i in range(1, sheet.max_row + 1):
-        column_value.append(cell_value(sheet, row=i, column=col_n))
-    return column_value
+    return ["" if value is None else value for value in iter_column_values(sheet, col_n)]
+
+
+def iter_column_values(sheet, col_n, start_row=1, end_row=None):
+    """ 按行遍历Sheet中一列单元格的值(一次遍历读取整列,支持只读模式打开的Sheet)
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取数据的Sheet对象
+    :param col_n: <int> 要读取列的列坐标
+    :param start_row: <int> 开始读取的行坐标(默认为第1行)
+    :param end_row: <int/None> 结束读取的行坐标(默认为Sheet的最大行)
+    :return: <generator> 依次返回该列每个单元格的值
+    """
+    for row in sheet.iter_rows(min_row=start_row, max_row=end_row, min_col=col_n, max_col=col_n, values_only=True):
+        yield row[0] if row else None
+
+
+def column_as_array(sheet, col_n, typecode="d", start_row=1, end_row=None, as_numpy=False):
+    """ 将Excel表单中的一列数据读取为数值数组(用于对整列数据求和/求平均值等汇总计算)
+    空单元格及非数值内容的转换规则与cell_as_int(整数类型)/cell_as_float(浮点数类型)相同;
+    整数类型中超出数组类型取值范围的数值(例如"卡号62220212345678901234"中提取的数字,1e30)转换为0,
+    与enhance_csv.parse_int对超出64位整数范围的数值的处理相同
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取数据的Sheet对象
+    :param col_n: <int> 要读取列的列坐标
+    :param typecode: <str> 数组类型,与array.array的类型代码相同:"q"/"l"/"i"=整数,"d"/"f"=浮点数(默认为"d")
+    :param start_row: <int> 开始读取的行坐标(默认为第1行,通常应设为数据开始的行)
+    :param end_row: <int/None> 结束读取的行坐标(默认为Sheet的最大行)
+    :param as_numpy: <bool> 是否返回NumPy数组(与array.array共用内存,不会复制数据;需要安装numpy)
+    :return: <array.array/numpy.ndarray> 该列数据转换完成的数值数组,按行坐标从小到大排序
+    """
+    if typecode in ("d", "f"):
+        convert = value_as_float
+    else:
+        bits = 8 * array.array(typecode).itemsize
+        low, high = (0, 2 ** bits - 1) if typecode.isupper() else (-2 ** (bits - 1), 2 ** (bits - 1) - 1)
+
+        def convert(value):
+            value = value_as_int(value)
+            return value if low <= value <= high else 0
+    result = array.array(typecode, map(convert, iter_column_values(sheet, col_n, start_row, end_row)))
+    if as_numpy:
+        import numpy
+        return numpy.frombuffer(result, dtype=typecode)
+    return result
+
+
+def column_as_str(sheet, col_n, start_row=1, end_row=None):
+    """ 将Excel表单中的一列数据读取为字符串列表(转换规则与cell_as_str相同)
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取数据的Sheet对象
+    :param col_n: <int> 要读取列的列坐标
+    :param start_row: <int> 开始读取的行坐标(默认为第1行)
+    :param end_row: <int/None> 结束读取的行坐标(默认为Sheet的最大行)
+    :return: <list:str> 该列数据转换完成的字符串列表,按行坐标从小到大排序
+    """
+    return list(map(value_as_str, iter_column_values(sheet, col_n, start_row, end_row)))
 
 
 def row_value_by_cn(sheet, row_n, col_n_list):
@@ -343,6 +638,69 @@ def row_any_value_by_cn(sheet, column_title_row, row_n, column_title_list):
         return None
 
 
+class RowExtractor:
+    """
+    行数据提取器:在标题行中只查找一次列坐标,之后按预先计算的列坐标元组读取每行数据
+    返回结果与row_any_value_by_cn相同(读取超过一列返回list,读取一列返回该单元格的内容)
+    构造方法:RowExtractor.from_sheet(sheet, column_title_row, column_title_list)
+    读取方法:extractor.row(sheet, row_n) / extractor.values(row)
+    """
+
+    def __init__(self, column_title_list, col_n_list):
+        """
+        行数据提取器:构造器
+        :param column_title_list: <list> 需要读取的列的列名列表
+        :param col_n_list: <dict> 列名对应的列坐标字典,形如find_some_column的返回结果,例如: {'平台':1, '目前名称':2}
+        """
+        self.col_n = tuple(col_n_list[title] for title in column_title_list)  # 各列的列坐标(不存在的列为None)
+        self.single = len(self.col_n) == 1  # 是否只读取一列
+        self.complete = None not in self.col_n  # 是否所有列都存在
+        if self.complete and len(self.col_n) > 0:
+            self.getter = operator.itemgetter(*[j - 1 for j in self.col_n])
+        else:
+            self.getter = None
+
+    @classmethod
+    def from_sheet(cls, sheet, column_title_row, column_title_list):
+        """ 在Sheet的标题行中查找列坐标并生成行数据提取器
+        :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取数据的Sheet对象
+        :param column_title_row: <int> 列名所在的行坐标
+        :param column_title_list: <list> 需要读取的列的列名列表
+        :return: <RowExtractor> 行数据提取器
+        """
+        return cls(column_title_list, find_some_column(sheet, column_title_list, row_n=column_title_row,
+                                                       must_exist=False))
+
+    def row(self, sheet, row_n):
+        """ 读取Sheet中指定行的数据(使用sheet.cell随机访问单元格)
+        :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取数据的Sheet对象
+        :param row_n: <int> 需要读取的行坐标
+        :return: 若读取超过一列,返回:[数据,数据,...];若读取一列,返回: <object> 该单元格的内容
+        """
+        row_value = []
+        for j in self.col_n:
+            if j is None:
+                row_value.append(None)
+            else:
+                value = sheet.cell(row=row_n, column=j).value
+                row_value.append("" if value is None else value)
+        return row_value[0] if self.single else row_value
+
+    def values(self, row):
+        """ 从已读取的一行单元格的值中提取数据
+        :param row: <tuple> 一行单元格的值,形如iter_row_values的返回结果
+        :return: 若读取超过一列,返回:[数据,数据,...];若读取一列,返回: <object> 该单元格的内容
+        """
+        if self.single:
+            if self.getter is None:
+                return None
+            value = self.getter(row)
+            return "" if value is None else value
+        if self.getter is not None:
+            return ["" if value is None else value for value in self.getter(row)]
+        return [None if j is None else "" if row[j - 1] is None else row[j - 1] for j in self.col_n]
+
+
 def get_sheet(sheet, column_title_list, title_rn=1, data_rn=None, classify_column=None, classify_unique=False,
               not_none_column=None):
     """ 批量读取整个Excel表单中的数据
@@ -382,9 +740,10 @@ def get_sheet_by_line(sheet, column_title_list, title_rn=1, data_rn=2, sheet_nn_
     若读取一列,返回:[数据,数据]
     """
     data_list = []
+    extractor = RowExtractor.from_sheet(sheet, title_rn, column_title_list)
     for i in range(data_rn, sheet.max_row + 1):
         if not some_cell_is_none(sheet, i, sheet_nn_cn_list):
-            data_list.append(row_any_value_by_cn(sheet, title_rn, i, column_title_list))
+            data_list.append(extractor.row(sheet, i))
     return data_list
 
 
@@ -407,8 +766,9 @@ def get_sheet_in_classify(sheet, classify_column, column_title_list, title_rn=1,
     """
     data_dict = {}
     sheet_cn_classify = find_column(sheet, classify_column, row_n=title_rn)
+    extractor = RowExtractor.from_sheet(sheet, title_rn, column_title_list)
     for i in range(data_rn, sheet.max_row + 1):
-        data_item = row_any_value_by_cn(sheet, title_rn, i, column_title_list)
+        data_item = extractor.row(sheet, i)
         data_classify = cell_value(sheet, row=i, column=sheet_cn_classify)
         if classify_unique and data_classify is not None and not some_cell_is_none(sheet, i, sheet_nn_cn_list):
             data_dict[data_classify] = data_item
@@ -435,9 +795,10 @@ def get_sheet_some_classify(sheet, classify_column, column_title_list, title_rn=
     """
     data_dict = {}
     sheet_clfy_cn_list = find_some_column(sheet, classify_column, row_n=title_rn)
+    extractor = RowExtractor.from_sheet(sheet, title_rn, column_title_list)
     for i in range(data_rn, sheet.max_row + 1):
         if not some_cell_is_none(sheet, i, sheet_clfy_cn_list) and not some_cell_is_none(sheet, i, sheet_nn_cn_list):
-            data_item = row_any_value_by_cn(sheet, title_rn, i, column_title_list)
+            data_item = extractor.row(sheet, i)
             data_classify = data_dict
             for j in range(len(classify_column) - 1):
                 classify_name = cell_value(sheet, row=i, column=sheet_clfy_cn_list[classify_column[j]])
@@ -454,6 +815,350 @@ def get_sheet_some_classify(sheet, classify_column, column_title_list, title_rn=
     return data_dict
 
 
+def iter_row_values(sheet, min_row=1, max_row=None):
+    """ 按行遍历Sheet中单元格的值(支持只读模式load(..., read_only=True)打开的Sheet)
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要遍历的Sheet对象
+    :param min_row: <int> 开始遍历的行坐标
+    :param max_row: <int/None> 结束遍历的行坐标(默认为Sheet的最大行)
+    :return: <generator> 依次返回每行单元格的值(tuple),长度不足Sheet总列数的行会用None补齐
+    """
+    max_column = sheet.max_column or 0
+    for row in sheet.iter_rows(min_row=min_row, max_row=max_row, values_only=True):
+        if len(row) < max_column:
+            row = row + (None,) * (max_column - len(row))
+        yield row
+
+
+def find_some_column_in_row(sheet, title_row, column_title_list, must_exist=True):
+    """ 在已读取的标题行中查找一组指定标题的列,并返回一组列坐标(与find_some_column的返回结果相同)
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 标题行所在的Sheet对象(用于输出错误信息)
+    :param title_row: <tuple> 标题行中单元格的值,形如iter_row_values的返回结果
+    :param column_title_list: <list> 目标列的标题
+    :param must_exist: <bool> 在目标列不存在时的处理方案:True=退出程序,False=返回None(默认为True)
+    :return: <dict> Sheet中该组目标列的列坐标字典,例如: {'平台':1, '目前名称':2}
+    """
+    col_n_list = {}
+    for column_title in column_title_list:
+        col_n_list[column_title] = None
+        for j in range(len(title_row)):
+            if title_row[j] == column_title:
+                col_n_list[column_title] = j + 1
+                break
+        if col_n_list[column_title] is None and must_exist:
+            basic.sys_exit("[Error] 目标列在 Sheet:" + sheet.title + " 中不存在(列名:" + column_title + ")")
+    return col_n_list
+
+
+def iter_sheet_by_line(sheet, column_title_list, title_rn=1, data_rn=None, not_none_column=None):
+    """ 流式读取整个Excel表单每行中部分列的数据(按行遍历,支持只读模式打开的Sheet)
+    与get_sheet_by_line的每行结果相同,但每读取一行即返回一行,内存占用不随Sheet行数增长
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取数据的Sheet对象
+    :param column_title_list: <list> 需要读取的列的列名列表
+    :param title_rn: <int> 列名所在的行坐标(默认为第1行)
+    :param data_rn: <int> 开始读取数据的行(默认为列名所在行的后一行)
+    :param not_none_column: <list> 不允许为空值的列名列表,若这些列出现空值则放弃读取该行
+    :return: <generator> 若读取超过一列,则依次返回:[数据,数据];若读取一列,依次返回:数据
+    """
+    for _, data_item in _iter_sheet_item(sheet, column_title_list, title_rn, data_rn, not_none_column):
+        yield data_item
+
+
+def _iter_sheet_item(sheet, column_title_list, title_rn=1, data_rn=None, not_none_column=None, classify_column=None):
+    """ 流式读取Excel表单每行的数据及分类列的值(iter_sheet_by_line与get_sheet_stream的读取过程)
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取数据的Sheet对象
+    :param column_title_list: <list> 需要读取的列的列名列表
+    :param title_rn: <int> 列名所在的行坐标(默认为第1行)
+    :param data_rn: <int> 开始读取数据的行(默认为列名所在行的后一行)
+    :param not_none_column: <list> 不允许为空值的列名列表,若这些列出现空值则放弃读取该行
+    :param classify_column: <list/None> 分类列的列名列表(分类列出现空值时不会跳过该行)
+    :return: <generator> 依次返回:(分类列的值列表(空单元格为""), 该行数据)
+    """
+    if data_rn is None:
+        data_rn = title_rn + 1
+    title_row = next(iter_row_values(sheet, min_row=title_rn, max_row=title_rn), ())
+    extractor = RowExtractor(column_title_list,
+                             find_some_column_in_row(sheet, title_row, column_title_list, must_exist=False))
+    sheet_nn_cn_list = find_some_column_in_row(sheet, title_row, basic.not_null_list(not_none_column))
+    sheet_clfy_cn_list = find_some_column_in_row(sheet, title_row, basic.not_null_list(classify_column))
+    nn_cn = [sheet_nn_cn_list[title] - 1 for title in sheet_nn_cn_list]
+    clfy_cn = [sheet_clfy_cn_list[title] - 1 for title in basic.not_null_list(classify_column)]
+    for row in iter_row_values(sheet, min_row=data_rn):
+        if any(row[j] is None for j in nn_cn):
+            continue
+        yield ["" if row[j] is None else row[j] for j in clfy_cn], extractor.values(row)
+
+
+def get_sheet_stream(sheet, column_title_list, title_rn=1, data_rn=None, classify_column=None, classify_unique=False,
+                     not_none_column=None):
+    """ 流式读取整个Excel表单中的数据(按行遍历,支持只读模式load(..., read_only=True)打开的Sheet)
+    参数及返回结果与get_sheet相同,但不会使用sheet.cell随机访问单元格,列名只在标题行中查找一次,
+    内存占用只取决于返回结果的大小,而与Sheet的大小无关
+    :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要读取数据的Sheet对象
+    :param column_title_list: <list> 需要读取的列的列名列表
+    :param title_rn: <int> 列名所在的行坐标
+    :param data_rn: <int> 开始读取数据的行(默认为列名所在行的后一行)
+    :param classify_column: <list/str/none> 如果需要依据某列单元格的值对结果汇总，则填写该列的列名
+    :param classify_unique: <bool> 每个分类是否只需要唯一值
+    :param not_none_column: <list> 不允许为空值的列名列表,若这些列出现空值则放弃读取该行
+    :return: <list/dict> 与get_sheet的返回结果相同
+    """
+    if classify_column is None or classify_column == []:
+        return list(iter_sheet_by_line(sheet, column_title_list, title_rn, data_rn, not_none_column))
+    data_dict = {}
+    if isinstance(classify_column, str):
+        for classify_list, data_item in _iter_sheet_item(sheet, column_title_list, title_rn, data_rn,
+                                                         not_none_column, [classify_column]):
+            if classify_unique:
+                data_dict[classify_list[0]] = data_item
+            else:
+                basic.add_dict_to_list(data_dict, classify_list[0], data_item)
+        return data_dict
+    if isinstance(classify_column, list):
+        for classify_list, data_item in _iter_sheet_item(sheet, column_title_list, title_rn, data_rn,
+                                                         not_none_column, classify_column):
+            if "" in classify_list:  # 分类列存在空值时放弃读取该行
+                continue
+            data_classify = data_dict
+            for classify_name in classify_list[:-1]:
+                if classify_name not in data_classify:
+                    data_classify[classify_name] = {}
+                data_classify = data_classify[classify_name]
+            if classify_unique:
+                data_classify[classify_list[-1]] = data_item
+            else:
+                basic.add_dict_to_list(data_classify, classify_list[-1], data_item)
+        return data_dict
+
+
+class SheetCache:
+    """
+    Sheet数据缓存:按(文件路径,Sheet名称,读取参数,文件修改时间,文件大小)缓存get_sheet的读取结果,
+    文件被修改后缓存自动失效;按最近最少使用(LRU)原则淘汰,内存中缓存结果的总大小不超过max_bytes,
+    若设置了spill_dir,被淘汰的结果会写入该目录(pickle格式),再次读取时从磁盘加载而不必重新解析Excel文件;
+    写入同一文件新的修改时间/大小的结果时,该文件旧版本的磁盘结果会被删除
+    缓存key的第1个元素为文件路径,最后2个元素为文件修改时间及文件大小
+    使用方法:get_sheet_cached(path, column_title_list, ..., cache=SheetCache(...))
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, spill_dir=None):
+        """
+        Sheet数据缓存:构造器
+        :param max_bytes: <int> 内存中缓存结果的总大小上限(按pickle序列化后的字节数计算)
+        :param spill_dir: <str/None> 被淘汰结果的写入目录,None=直接丢弃
+        """
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.items = collections.OrderedDict()  # key: 缓存key, value: (读取结果, 字节数)
+        self.total_bytes = 0
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self.items)
+
+    def spill_prefix(self, key):
+        """ 获取同一文件的缓存结果在磁盘中的文件名前缀
+        :param key: <tuple> 缓存key
+        :return: <str> 文件名前缀(由文件路径计算)
+        """
+        return hashlib.sha1(repr(key[0]).encode("UTF-8")).hexdigest() + "_"
+
+    def spill_path(self, key):
+        """ 获取缓存结果在磁盘中的写入路径,文件名为:文件名前缀+文件修改时间_文件大小_缓存key的哈希值.pkl
+        :param key: <tuple> 缓存key
+        :return: <str> 写入路径
+        """
+        return os.path.join(self.spill_dir, self.spill_prefix(key) + str(key[-2]) + "_" + str(key[-1]) + "_" +
+                            hashlib.sha1(repr(key).encode("UTF-8")).hexdigest() + ".pkl")
+
+    def get(self, key):
+        """ 读取缓存结果(内存中不存在时尝试从磁盘读取)
+        :param key: <tuple> 缓存key
+        :return: <object> 缓存的读取结果,若不存在则返回None
+        """
+        if key in self.items:
+            self.items.move_to_end(key)
+            return self.items[key][0]
+        if self.spill_dir is not None and os.path.exists(self.spill_path(key)):
+            try:
+                with open(self.spill_path(key), "rb") as fr:
+                    data = fr.read()
+                value = pickle.loads(data)
+            except FileNotFoundError:  # 已被其他进程删除
+                return None
+            except (EOFError, pickle.UnpicklingError):  # 文件不完整(写入过程中程序中断等),删除后按缓存不存在处理
+                print("[Warning] 缓存文件损坏,已删除(" + self.spill_path(key) + ")")
+                try:
+                    os.remove(self.spill_path(key))
+                except FileNotFoundError:
+                    pass
+                return None
+            self._put(key, value, len(data))
+            return value
+        return None
+
+    def set(self, key, value):
+        """ 写入缓存结果(只写入内存,被淘汰时才写入磁盘),并删除该文件旧版本的结果
+        :param key: <tuple> 缓存key
+        :param value: <object> 需要缓存的读取结果
+        :return: <None>
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remove_stale(key)
+        self._put(key, value, len(data), data)
+
+    def _remove_stale(self, key):
+        """ 删除与缓存key同一文件,但文件修改时间或大小不同(旧版本)的内存及磁盘结果
+        :param key: <tuple> 缓存key
+        :return: <None>
+        """
+        for item_key in [item_key for item_key in self.items
+                         if item_key[0] == key[0] and item_key[-2:] != key[-2:]]:  # 内存中的旧版本结果不再写入磁盘
+            self.total_bytes -= self.items.pop(item_key)[1]
+        if self.spill_dir is None:
+            return
+        prefix = self.spill_prefix(key)
+        current = prefix + str(key[-2]) + "_" + str(key[-1]) + "_"
+        for file_name in os.listdir(self.spill_dir):
+            if file_name.startswith(prefix) and not file_name.startswith(current):
+                try:
+                    os.remove(os.path.join(self.spill_dir, file_name))
+                except FileNotFoundError:  # 已被其他进程删除
+                    pass
+
+    def _spill(self, key, value, data=None):
+        """ 将被淘汰的结果写入磁盘(未设置spill_dir或磁盘中已经存在时不写入)
+        :param key: <tuple> 缓存key
+        :param value: <object> 读取结果
+        :param data: <bytes/None> 读取结果序列化后的内容(None=重新序列化)
+        :return: <None>
+        """
+        if self.spill_dir is None or os.path.exists(self.spill_path(key)):
+            return
+        if data is None:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        # 先写入临时文件再替换,其他进程不会读取到写入了一部分的文件
+        temp_path = os.path.join(self.spill_dir, "tmp_" + str(os.getpid()) + "_" +
+                                 os.path.basename(self.spill_path(key)))
+        with open(temp_path, "wb") as fw:
+            fw.write(data)
+        os.replace(temp_path, self.spill_path(key))
+
+    def _put(self, key, value, size, data=None):
+        """ 将读取结果放入内存缓存,并淘汰最近最少使用的结果直到总大小不超过上限(被淘汰的结果写入磁盘)
+        :param key: <tuple> 缓存key
+        :param value: <object> 读取结果
+        :param size: <int> 读取结果序列化后的字节数
+        :param data: <bytes/None> 读取结果序列化后的内容(结果超过上限而直接写入磁盘时使用)
+        :return: <None>
+        """
+        if key in self.items:
+            self.total_bytes -= self.items.pop(key)[1]
+        if size > self.max_bytes:
+            self._spill(key, value, data)
+            return
+        self.items[key] = (value, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            evict_key, (evict_value, evict_size) = self.items.popitem(last=False)
+            self.total_bytes -= evict_size
+            self._spill(evict_key, evict_value)
+
+    def clear(self):
+        """ 清空内存中的缓存结果(不删除已写入磁盘的结果,内存中的结果也不会写入磁盘)
+        :return: <None>
+        """
+        self.items.clear()
+        self.total_bytes = 0
+
+
+# 默认的Sheet数据缓存(进程内共享)
+sheet_cache = SheetCache()
+
+
+def get_sheet_cached(path, column_title_list, sheet_name=None, title_rn=1, data_rn=None, classify_column=None,
+                     classify_unique=False, not_none_column=None, data_only=False, must_exist=True, cache=None):
+    """ 读取Excel文件中指定Sheet的数据(带缓存),同一文件未被修改时再次读取直接返回缓存的结果
+    适合在一个程序中多次读取同一个映射表/改名表等数据表;
+    注意:返回结果与缓存共用同一对象,请不要修改返回结果
+    :param path: <str> 要加载的Excel文件的地址路径
+    :param column_title_list: <list> 需要读取的列的列名列表
+    :param sheet_name: <str/None> 要加载Sheet的名称,若为None则读取当前active的Sheet
+    :param title_rn: <int> 列名所在的行坐标
+    :param data_rn: <int> 开始读取数据的行(默认为列名所在行的后一行)
+    :param classify_column: <list/str/none> 如果需要依据某列单元格的值对结果汇总，则填写该列的列名
+    :param classify_unique: <bool> 每个分类是否只需要唯一值
+    :param not_none_column: <list> 不允许为空值的列名列表,若这些列出现空值则放弃读取该行
+    :param data_only: <bool> 是否只读取数据,即只提取公式结果而不提取公式(默认为False)
+    :param must_exist: <bool> 在Excel文件及Sheet不存在/不是Excel文件时的处理方案:True=退出程序,False=返回None(默认为True)
+    :param cache: <SheetCache/None> 使用的缓存,None=使用默认缓存sheet_cache
+    :return: <list/dict> 与get_sheet的返回结果相同
+    """
+    if cache is None:
+        cache = sheet_cache
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        if must_exist:
+            basic.sys_exit("[Error] 未找到Excel文件(" + path + ")")
+        print("[Warning] 未找到Excel文件(" + path + ")")
+        return None
+    key = (os.path.abspath(path), sheet_name, tuple(column_title_list), title_rn, data_rn,
+           tuple(classify_column) if isinstance(classify_column, list) else classify_column, classify_unique,
+           tuple(basic.not_null_list(not_none_column)), data_only, stat.st_mtime_ns, stat.st_size)
+    result = cache.get(key)
+    if result is None:
+        with open_sheet(path, sheet_name, read_only=True, data_only=data_only, must_exist=must_exist) as sheet:
+            if sheet is None:
+                return None
+            result = get_sheet_stream(sheet, column_title_list, title_rn, data_rn, classify_column, classify_unique,
+                                      not_none_column)
+        cache.set(key, result)
+    return result
+
+
+def load_many(path_list, column_title_list, sheet_name=None, title_rn=1, data_rn=None, classify_column=None,
+              classify_unique=False, not_none_column=None, processes=None, data_only=True):
+    """ 多进程批量读取多个Excel文件中的数据,每读取完成一个文件即返回该文件的结果
+    每个进程以只读模式加载Excel文件并通过get_sheet_stream读取数据,只将读取结果(而非Sheet对象)传回主进程
+    注意:在Windows中调用本函数的脚本需要放在 if __name__ == "__main__": 之下
+    :param path_list: <list> Excel文件地址路径列表,列表元素也可以是(地址路径,Sheet名称),以分别指定各文件读取的Sheet
+    :param column_title_list: <list> 需要读取的列的列名列表
+    :param sheet_name: <str/None> 默认读取的Sheet名称,若为None则读取当前active的Sheet
+    :param title_rn: <int> 列名所在的行坐标
+    :param data_rn: <int> 开始读取数据的行(默认为列名所在行的后一行)
+    :param classify_column: <list/str/none> 如果需要依据某列单元格的值对结果汇总，则填写该列的列名
+    :param classify_unique: <bool> 每个分类是否只需要唯一值
+    :param not_none_column: <list> 不允许为空值的列名列表,若这些列出现空值则放弃读取该行
+    :param processes: <int/None> 进程数量(默认为CPU核数)
+    :param data_only: <bool> 是否只读取数据,即只提取公式结果而不提取公式(默认为True)
+    :return: <generator> 按读取完成的先后顺序依次返回:(地址路径, Sheet名称, get_sheet的返回结果),
+    若Excel文件或Sheet不存在,则读取结果为None;若分类列或不允许为空值的列不存在,工作进程中的异常会在主进程中抛出
+    """
+    task_list = []
+    for item in path_list:
+        path, name = (item, sheet_name) if isinstance(item, str) else item
+        task_list.append((path, name, column_title_list, title_rn, data_rn, classify_column, classify_unique,
+                          not_none_column, data_only))
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap_unordered(_load_many_item, task_list):
+            yield result
+
+
+def _load_many_item(args):
+    """ 读取一个Excel文件中的数据(load_many在工作进程中执行的读取过程)
+    :param args: <tuple> (地址路径,Sheet名称,列名列表,列名所在行,开始读取数据的行,分类列,分类是否唯一,不允许为空值的列,是否只读取数据)
+    :return: <tuple> (地址路径, Sheet名称, get_sheet的返回结果)
+    """
+    path, sheet_name, column_title_list, title_rn, data_rn, classify_column, classify_unique, \
+        not_none_column, data_only = args
+    with open_sheet(path, sheet_name, read_only=True, data_only=data_only, must_exist=False) as sheet:
+        if sheet is None:
+            return path, sheet_name, None
+        return path, sheet_name, get_sheet_stream(sheet, column_title_list, title_rn, data_rn, classify_column,
+                                                  classify_unique, not_none_column)
+
+
 def write_row(sheet, row, value_list):
     """ 批量写入一行数据
     :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要写入数据的Sheet对象
@@ -462,6 +1167,7 @@ def write_row(sheet, row, value_list):
     :return:隐含返回值,结果更新于[sheet]
     """
     if value_list is not None:
+        drop_cell_index(sheet)
         for i in range(len(value_list)):
             sheet.cell(row=row, column=i + 1).value = value_list[i]
 
@@ -474,6 +1180,7 @@ def write_column(sheet, column, value_list):
     :return:隐含返回值,结果更新于[sheet]
     """
     if value_list is not None:
+        drop_cell_index(sheet)
         for i in range(len(value_list)):
             sheet.cell(row=i + 1, column=column).value = value_list[i]
 
@@ -489,11 +1196,9 @@ def write_sheet_cls_list(sheet, title, data, classify_index):
     """
     write_row(sheet, 1, title)
     sheet_rn = 2
-    for classify in data:
-        for item in copy.deepcopy(data[classify]):
-            item.insert(classify_index, classify)
-            write_row(sheet, sheet_rn, item)
-            sheet_rn += 1
+    for item in rows_cls_list(data, classify_index):
+        write_row(sheet, sheet_rn, item)
+        sheet_rn += 1
 
 
 def write_sheet_cls_item(sheet, title, data, classify_index=0):
@@ -507,13 +1212,59 @@ def write_sheet_cls_item(sheet, title, data, classify_index=0):
     """
     write_row(sheet, 1, title)
     sheet_rn = 2
-    for classify in data:
-        item = copy.deepcopy(data[classify])
-        item.insert(classify_index, classify)
+    for item in rows_cls_item(data, classify_index):
         write_row(sheet, sheet_rn, item)
         sheet_rn += 1
 
 
+def rows_cls_list(data, classify_index):
+    """ 将分类数据(key为分类,value为该分类多条记录list的list)展开为逐行数据,分类字段插入到每行数据中
+    不会复制或修改原数据,每次只生成一行数据
+    :param data: <dict> 分类数据,例如:{"分类1":[[列1,列2],[列1,列2]],"分类2":[[列1,列2],[列1,列2]]}
+    :param classify_index: <int> 分类字段添加到每行数据中的列坐标(从0开始)
+    :return: <generator> 依次返回每行数据,例如:[分类1,列1,列2]
+    """
+    for classify in data:
+        for item in data[classify]:
+            yield item[:classify_index] + [classify] + item[classify_index:]
+
+
+def rows_cls_item(data, classify_index=0):
+    """ 将分类数据(key为分类,value为单条记录list)展开为逐行数据,分类字段插入到每行数据中
+    不会复制或修改原数据,每次只生成一行数据
+    :param data: <dict> 分类数据,例如:{"分类1":[列1,列2],"分类2":[列1,列2]}
+    :param classify_index: <int> 分类字段添加到每行数据中的列坐标(从0开始)
+    :return: <generator> 依次返回每行数据,例如:[分类1,列1,列2]
+    """
+    for classify in data:
+        item = data[classify]
+        yield item[:classify_index] + [classify] + item[classify_index:]
+
+
+def write_sheet_stream(path, title, rows, sheet_name=None, must_write=True):
+    """ 使用只写模式(write_only)将逐行数据直接写入到新的Excel文件中
+    数据逐行追加,写入过的行不会保留在内存中,内存占用不随写入行数增长;
+    rows可以是生成器,例如: rows_cls_list, rows_cls_item, iter_sheet_by_line的返回结果
+    :param path: <str> 要写入的文件地址路径
+    :param title: <list/None> 写入数据的标题(None=不写入标题行)
+    :param rows: <iterable:list> 需要写入的逐行数据
+    :param sheet_name: <str/None> 写入的Sheet名称(默认为Sheet)
+    :param must_write: <bool> 在写入失败时(数据文件被占用)的处理方案:True=退出程序,False=返回False(默认为True)
+    :return: <int/bool> 写入的数据行数(不含标题行),写入失败时返回False
+    """
+    excel = Workbook(write_only=True)
+    sheet = excel.create_sheet("Sheet" if sheet_name is None else sheet_name)
+    if title is not None:
+        sheet.append(title)
+    row_num = 0
+    for row in rows:
+        sheet.append(row)
+        row_num += 1
+    if not save(excel, path, must_write=must_write):
+        return False
+    return row_num
+
+
 def get_border(sheet, row, column, dTop=True, dRight=True, dBottom=True, dLeft=True):
     """ 获取单元格边框样式
     :param sheet: <openpyxl.worksheet.worksheet.Worksheet> 需要获取样式的Sheet对象
@@ -4,13 +4,273 @@
 爬虫工具-基础工具包：MySQL数据库支持函数
 """
 
+import collections
+import contextlib
+import itertools
+import os
 import re
+import tempfile
+import threading
+import time
 
 import mysql.connector
 
+from utils import enhance_csv
+
+# 服务器或客户端不允许LOAD DATA LOCAL INFILE时的MySQL错误代码:
+# 1148=该MySQL版本不允许使用此命令,2068=客户端拒绝读取本地文件,3948=服务器禁用了读取本地文件
+LOCAL_INFILE_ERRNO = {1148, 2068, 3948}
+
+# 写入LOAD DATA使用的TSV文件时需要转义的字符(与LOAD DATA默认的ESCAPED BY '\\'对应)
+TSV_ESCAPE = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+
+# 可以重试的MySQL错误代码:1205=锁等待超时,1213=死锁,2006=服务器连接断开,2013=查询过程中连接断开,
+# 2055=连接因系统错误断开(其他错误,例如权限不足,数据库不存在,数据包错误等,重试也不会成功,直接抛出)
+TRANSIENT_ERRNO = {1205, 1213, 2006, 2013, 2055}
+
+
+class ConnectionPool:
+    """
+    MySQL数据库连接池:复用同一主机/用户/数据库的连接,避免每次读写都建立新连接
+    连接数量不超过size(连接全部被占用时等待其他线程归还);空闲超过idle_timeout秒的连接被关闭,
+    空闲超过ping_interval秒的连接在取出时检查是否可用(不可用则关闭并重新建立连接)
+    使用方法:with pool.connection() as mysql_database: ...(执行过程中出现异常时,该连接被关闭而不会放回连接池)
+    """
+
+    def __init__(self, host: str, user: str, password: str, database: str = None, use_unicode: bool = True,
+                 size: int = 8, idle_timeout: float = 300, ping_interval: float = 30, connect=None):
+        """
+        MySQL数据库连接池:构造器
+        :param host: <str> MySQL数据库主机的Url
+        :param user: <str> MySQL数据库的访问用户名
+        :param password: <str> MySQL数据库的访问密码
+        :param database: <str/None> MySQL数据库名称(None=不指定数据库)
+        :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
+        :param size: <int> 连接数量上限(包括正在使用和空闲的连接)
+        :param idle_timeout: <float> 空闲连接的保留时间(秒)
+        :param ping_interval: <float> 空闲超过该时间(秒)的连接在取出时检查是否可用
+        :param connect: <function/None> 建立连接的函数,参数与mysql.connector.connect相同(默认为mysql.connector.connect)
+        """
+        self.params = {"host": host, "user": user, "password": password, "use_unicode": use_unicode}
+        if database is not None:
+            self.params["database"] = database
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.connect = connect or mysql.connector.connect
+        self.idle = collections.deque()  # 空闲连接: (连接, 归还时间),最近归还的在右侧
+        self.total = 0  # 当前连接数量(包括正在使用和空闲的连接)
+        self.pid = os.getpid()  # 创建连接的进程(子进程不能使用父进程的连接)
+        self.condition = threading.Condition()
+
+    def __len__(self):
+        return self.total
+
+    def _check_pid(self):
+        """ 若当前进程不是创建连接池的进程(fork产生的子进程),则丢弃从父进程继承的连接(不关闭,以免影响父进程)
+        :return: <None>
+        """
+        if os.getpid() != self.pid:
+            self.idle.clear()
+            self.total = 0
+            self.pid = os.getpid()
+
+    def _close(self, mysql_database):
+        """ 关闭一个连接(忽略关闭时的异常)
+        :param mysql_database: <mysql.connector.connection.MySQLConnection> 需要关闭的连接
+        :return: <None>
+        """
+        try:
+            mysql_database.close()
+        except Exception:
+            pass
+
+    def evict(self):
+        """ 关闭空闲超过idle_timeout秒的连接
+        :return: <int> 关闭的连接数量
+        """
+        now = time.monotonic()
+        evict_list = []
+        with self.condition:
+            self._check_pid()
+            while self.idle and now - self.idle[0][1] > self.idle_timeout:
+                evict_list.append(self.idle.popleft()[0])
+            self.total -= len(evict_list)
+            if evict_list:
+                self.condition.notify(len(evict_list))
+        for mysql_database in evict_list:
+            self._close(mysql_database)
+        return len(evict_list)
+
+    def acquire(self, timeout: float = None):
+        """ 从连接池中取出一个可用的连接(没有空闲连接且连接数量未达上限时建立新连接)
+        :param timeout: <float/None> 连接全部被占用时的最长等待时间(秒),None=一直等待
+        :return: <mysql.connector.connection.MySQLConnection> 可用的连接
+        """
+        self.evict()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.condition:
+                self._check_pid()
+                while not self.idle and self.total >= self.size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("MySQL连接池等待超时(" + self.params["host"] + ")")
+                    self.condition.wait(remaining)
+                if self.idle:
+                    mysql_database, release_time = self.idle.pop()
+                else:
+                    mysql_database, release_time = None, None
+                    self.total += 1
+            if mysql_database is None:
+                try:
+                    return self.connect(**self.params)
+                except Exception:
+                    self._discard()
+                    raise
+            if time.monotonic() - release_time <= self.ping_interval or self._is_connected(mysql_database):
+                return mysql_database
+            self._close(mysql_database)
+            self._discard()
+
+    def _is_connected(self, mysql_database):
+        """ 检查连接是否可用
+        :param mysql_database: <mysql.connector.connection.MySQLConnection> 需要检查的连接
+        :return: <bool> 连接是否可用:True=是,False=否
+        """
+        try:
+            return mysql_database.is_connected()
+        except Exception:
+            return False
+
+    def _discard(self):
+        """ 减少一个连接数量(连接已关闭或建立失败),并唤醒一个等待连接的线程
+        :return: <None>
+        """
+        with self.condition:
+            self.total -= 1
+            self.condition.notify()
+
+    def release(self, mysql_database, discard: bool = False):
+        """ 将连接归还到连接池
+        :param mysql_database: <mysql.connector.connection.MySQLConnection> 取出的连接
+        :param discard: <bool> 是否关闭该连接而不放回连接池(连接执行出错等情况);
+        放回连接池前回滚未提交的事务,若回滚失败则同样关闭该连接
+        :return: <None>
+        """
+        if os.getpid() != self.pid:  # 从父进程继承的连接,直接丢弃(关闭会影响父进程)
+            return
+        if not discard:
+            try:  # 回滚未提交的事务,避免下一次取出该连接时继承旧的事务快照,锁及未提交的写入
+                mysql_database.rollback()
+            except Exception:
+                discard = True
+        if discard:
+            self._close(mysql_database)
+            self._discard()
+            return
+        with self.condition:
+            self.idle.append((mysql_database, time.monotonic()))
+            self.condition.notify()
+
+    @contextlib.contextmanager
+    def connection(self, timeout: float = None):
+        """ 取出一个连接,退出时归还到连接池(执行过程中出现异常时关闭该连接)
+        使用方法: with pool.connection() as mysql_database: ...
+        :param timeout: <float/None> 连接全部被占用时的最长等待时间(秒),None=一直等待
+        :return: <mysql.connector.connection.MySQLConnection> 可用的连接
+        """
+        mysql_database = self.acquire(timeout)
+        try:
+            yield mysql_database
+        except BaseException:
+            self.release(mysql_database, discard=True)
+            raise
+        self.release(mysql_database)
+
+    def close(self):
+        """ 关闭所有空闲连接(正在使用的连接在归还时仍会放回连接池)
+        :return: <None>
+        """
+        with self.condition:
+            self._check_pid()
+            close_list = [item[0] for item in self.idle]
+            self.idle.clear()
+            self.total -= len(close_list)
+            self.condition.notify(len(close_list))
+        for mysql_database in close_list:
+            self._close(mysql_database)
+
+
+# 各主机/用户/数据库的连接池(进程内共享)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(host: str, user: str, password: str, database: str = None, use_unicode: bool = True, **kwargs):
+    """ 获取主机/用户/数据库对应的连接池(不存在时创建)
+    :param host: <str> MySQL数据库主机的Url
+    :param user: <str> MySQL数据库的访问用户名
+    :param password: <str> MySQL数据库的访问密码
+    :param database: <str/None> MySQL数据库名称(None=不指定数据库)
+    :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
+    :param kwargs: 创建连接池时使用的其他参数,见ConnectionPool(size,idle_timeout,ping_interval,connect);
+    只在创建连接池时生效,例如先调用get_pool(..., connect=测试用的连接函数),之后pooled=True的各函数均使用该连接池
+    :return: <ConnectionPool> 连接池
+    """
+    key = (host, user, database, use_unicode)
+    old_pool = None
+    with _pools_lock:
+        if key not in _pools or _pools[key].params["password"] != password:
+            old_pool = _pools.get(key)
+            _pools[key] = ConnectionPool(host, user, password, database, use_unicode, **kwargs)
+        pool = _pools[key]
+    if old_pool is not None:  # 密码变化时关闭原连接池中的空闲连接
+        old_pool.close()
+    return pool
+
+
+def close_pools():
+    """ 关闭所有连接池中的空闲连接
+    :return: <None>
+    """
+    with _pools_lock:
+        pool_list = list(_pools.values())
+        _pools.clear()
+    for pool in pool_list:
+        pool.close()
+
+
+@contextlib.contextmanager
+def connect(host: str, user: str, password: str, database: str = None, use_unicode: bool = True,
+            pooled: bool = False, **kwargs):
+    """ 获取MySQL数据库连接(上下文管理器)
+    使用方法: with connect(host, user, password, database) as mysql_database: ...
+    :param host: <str> MySQL数据库主机的Url
+    :param user: <str> MySQL数据库的访问用户名
+    :param password: <str> MySQL数据库的访问密码
+    :param database: <str/None> MySQL数据库名称(None=不指定数据库)
+    :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
+    :param pooled: <bool> 是否使用连接池:True=从get_pool的连接池中取出并在退出时归还,False=建立新连接并在退出时关闭
+    :param kwargs: mysql.connector.connect的其他参数(例如allow_local_infile),只在不使用连接池时生效
+    :return: <mysql.connector.connection.MySQLConnection> MySQL数据库连接
+    """
+    if pooled:
+        with get_pool(host, user, password, database, use_unicode).connection() as mysql_database:
+            yield mysql_database
+        return
+    params = {"host": host, "user": user, "password": password, "use_unicode": use_unicode, **kwargs}
+    if database is not None:
+        params["database"] = database
+    mysql_database = mysql.connector.connect(**params)  # 链接到MySQL数据库
+    try:
+        yield mysql_database
+    finally:
+        mysql_database.close()
+
 
 def select_by_sql(host: str, user: str, password: str, database: str, sql: str, columns: list,
-                  use_unicode: bool = True):
+                  use_unicode: bool = True, pooled: bool = False):
     """
     :param host: <str> MySQL数据库主机的Url
     :param user: <str> MySQL数据库的访问用户名
@@ -19,28 +279,14 @@ def select_by_sql(host: str, user: str, password: str, database: str, sql: str,
     :param sql: <str> 读取数据的SQL语句
     :param columns: <str> 需要读取的字段名称
     :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
+    :param pooled: <bool> 是否使用连接池(见connect),默认为False
     :return: <list> 读取的数据结果
     """
-    mysql_database = mysql.connector.connect(host=host, user=user, password=password, database=database,
-                                             use_unicode=use_unicode)  # 链接到MySQL数据库
-    mysql_cursor = mysql_database.cursor()  # 获取数据库操作句柄
-    mysql_cursor.execute(sql)  # 生成并执行SELECT语句
-    mysql_results = mysql_cursor.fetchall()  # 获取SQL语句执行的返回多行记录的结果
-    select_result = []
-    for mysql_result in mysql_results:  # 遍历:SQL语句检索的各行记录
-        if len(columns) > 1:  # 处理读取字段数超过1个的情况
-            select_item = []
-            for i in range(len(columns)):
-                select_item.append(mysql_result[i])
-            select_result.append(select_item)
-        elif len(columns) == 1:  # 处理读取字段数为1个的情况
-            select_result.append(mysql_result[0])
-    mysql_database.shutdown()
-    return select_result
+    return list(select_by_sql_iter(host, user, password, database, sql, columns, use_unicode, pooled=pooled))
 
 
 def select(host: str, user: str, password: str, database: str, table: str, columns: list,
-           use_unicode: bool = True, sql_where: str = ""):
+           use_unicode: bool = True, sql_where: str = "", pooled: bool = False):
     """ SELECT读取MySQL数据库的数据
     :param host: <str> MySQL数据库主机的Url
     :param user: <str> MySQL数据库的访问用户名
@@ -50,56 +296,96 @@ def select(host: str, user: str, password: str, database: str, table: str, colum
     :param columns: <list:str> 需要读取的字段名称列表
     :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
     :param sql_where: <str> 在执行SELECT语句时是否添加WHERE子句(默认为空,如添加应以WHERE开头)
+    :param pooled: <bool> 是否使用连接池(见connect),默认为False
     :return: <list> 读取的数据结果
     """
-    mysql_database = mysql.connector.connect(host=host, user=user, password=password, database=database,
-                                             use_unicode=use_unicode)  # 链接到MySQL数据库
-    mysql_cursor = mysql_database.cursor()  # 获取数据库操作句柄
-    mysql_cursor.execute(sql_select(table, columns, sql_where))  # 生成并执行SELECT语句
-    mysql_results = mysql_cursor.fetchall()  # 获取SQL语句执行的返回多行记录的结果
-    select_result = []
-    for mysql_result in mysql_results:  # 遍历:SQL语句检索的各行记录
-        if len(columns) > 1:  # 处理读取字段数超过1个的情况
-            select_item = []
-            for i in range(len(columns)):
-                select_item.append(mysql_result[i])
-            select_result.append(select_item)
-        elif len(columns) == 1:  # 处理读取字段数为1个的情况
-            select_result.append(mysql_result[0])
-    mysql_database.shutdown()
-    return select_result
-
-
-def create(host: str, user: str, password: str, sql: str):
+    return list(select_iter(host, user, password, database, table, columns, use_unicode, sql_where, pooled=pooled))
+
+
+def select_by_sql_iter(host: str, user: str, password: str, database: str, sql: str, columns: list,
+                       use_unicode: bool = True, batch_size: int = 1000, pooled: bool = False):
+    """ 流式读取MySQL数据库的数据(使用非缓冲游标,每次从服务器读取batch_size行,内存占用不随结果行数增长)
+    读取结束时归还/关闭连接;若提前停止读取(break或关闭生成器),该连接中尚未读取的结果无法继续使用,连接被直接关闭
+    :param host: <str> MySQL数据库主机的Url
+    :param user: <str> MySQL数据库的访问用户名
+    :param password: <str> MySQL数据库的访问密码
+    :param database: <str> 需要读取的MySQL数据库名称
+    :param sql: <str> 读取数据的SQL语句
+    :param columns: <list:str> 需要读取的字段名称列表
+    :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
+    :param batch_size: <int> 每次从服务器读取的行数
+    :param pooled: <bool> 是否使用连接池(见connect),默认为False
+    :return: <generator> 依次返回各行记录:若读取超过一个字段,返回[数据,数据,...];若读取一个字段,返回该字段的数据
+    """
+    column_num = len(columns)
+    with connect(host, user, password, database, use_unicode, pooled) as mysql_database:  # 链接到MySQL数据库
+        mysql_cursor = mysql_database.cursor(buffered=False)  # 获取数据库操作句柄(非缓冲游标)
+        mysql_cursor.execute(sql)  # 执行SELECT语句
+        while True:
+            mysql_results = mysql_cursor.fetchmany(batch_size)  # 读取下一批记录
+            if not mysql_results:
+                break
+            if column_num > 1:  # 处理读取字段数超过1个的情况
+                for mysql_result in mysql_results:
+                    yield list(mysql_result[:column_num])
+            elif column_num == 1:  # 处理读取字段数为1个的情况
+                for mysql_result in mysql_results:
+                    yield mysql_result[0]
+        mysql_cursor.close()
+
+
+def select_iter(host: str, user: str, password: str, database: str, table: str, columns: list,
+                use_unicode: bool = True, sql_where: str = "", batch_size: int = 1000, pooled: bool = False):
+    """ 流式SELECT读取MySQL数据库的数据(见select_by_sql_iter)
+    :param host: <str> MySQL数据库主机的Url
+    :param user: <str> MySQL数据库的访问用户名
+    :param password: <str> MySQL数据库的访问密码
+    :param database: <str> 需要读取的MySQL数据库名称
+    :param table: <str> 需要读取的MySQL数据表名称
+    :param columns: <list:str> 需要读取的字段名称列表
+    :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
+    :param sql_where: <str> 在执行SELECT语句时是否添加WHERE子句(默认为空,如添加应以WHERE开头)
+    :param batch_size: <int> 每次从服务器读取的行数
+    :param pooled: <bool> 是否使用连接池(见connect),默认为False
+    :return: <generator> 依次返回各行记录,格式与select_by_sql_iter相同
+    """
+    return select_by_sql_iter(host, user, password, database, sql_select(table, columns, sql_where), columns,
+                              use_unicode, batch_size, pooled)
+
+
+def create(host: str, user: str, password: str, sql: str, pooled: bool = False):
     """ CREATE创建数据表到MySQL数据库
     :param host: <str> MySQL数据库主机的Url
     :param user: <str> MySQL数据库的访问用户名
     :param password: <str> MySQL数据库的访问密码
     :param sql: <str> 创建数据表的SQL语句
+    :param pooled: <bool> 是否使用连接池(见connect),默认为False
     """
-    mysql_database = mysql.connector.connect(host=host, user=user, password=password)  # 链接到MySQL数据库
-    mysql_cursor = mysql_database.cursor()
-    mysql_cursor.execute(sql)
+    with connect(host, user, password, pooled=pooled) as mysql_database:  # 链接到MySQL数据库
+        mysql_cursor = mysql_database.cursor()
+        mysql_cursor.execute(sql)
     return True
 
 
-def execute(host: str, user: str, password: str, database: str, sql: str):
+def execute(host: str, user: str, password: str, database: str, sql: str, pooled: bool = False):
     """ 执行SQL语句
     :param host: <str> MySQL数据库主机的Url
     :param user: <str> MySQL数据库的访问用户名
     :param password: <str> MySQL数据库的访问密码
     :param database: <str> MYSQL数据库的名称
     :param sql: <str> 创建数据表的SQL语句
+    :param pooled: <bool> 是否使用连接池(见connect),默认为False
     :return:
     """
-    mysql_database = mysql.connector.connect(host=host, user=user, password=password, database=database)
-    mysql_cursor = mysql_database.cursor()
-    mysql_cursor.execute(sql)  # 执行SQL语句
-    mysql_database.commit()  # 数据表内容更新提交语句
+    with connect(host, user, password, database, pooled=pooled) as mysql_database:
+        mysql_cursor = mysql_database.cursor()
+        mysql_cursor.execute(sql)  # 执行SQL语句
+        mysql_database.commit()  # 数据表内容更新提交语句
     return mysql_cursor.rowcount
 
 
-def insert(host: str, user: str, password: str, database: str, table: str, data: list, use_unicode: bool = True):
+def insert(host: str, user: str, password: str, database: str, table: str, data: list, use_unicode: bool = True,
+           pooled: bool = False):
     """ INSERT写入数据到MySQL数据库
     :param host: <str> MySQL数据库主机的Url
     :param user: <str> MySQL数据库的访问用户名
@@ -108,21 +394,22 @@ def insert(host: str, user: str, password: str, database: str, table: str, data:
     :param table: <str> 需要写入的MySQL数据表名称
     :param data: <list:list> 需要写入的多条记录(所有记录的字段名与第一条记录的字段名统一)
     :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
+    :param pooled: <bool> 是否使用连接池(见connect),默认为False
     :return: <bool> 写入数据是否成功
     """
     if len(data) == 0:  # 处理需要写入的记录数为0的情况
         return 0
 
-    mysql_database = mysql.connector.connect(
-        host=host, user=user, password=password, database=database, use_unicode=use_unicode)  # 链接到MySQL数据库
-    mysql_cursor = mysql_database.cursor()
-    sql, val = sql_insert(table, data)
-    mysql_cursor.executemany(sql, val)  # 执行SQL语句
-    mysql_database.commit()  # 数据表内容更新提交语句
+    with connect(host, user, password, database, use_unicode, pooled) as mysql_database:  # 链接到MySQL数据库
+        mysql_cursor = mysql_database.cursor()
+        sql, val = sql_insert(table, data)
+        mysql_cursor.executemany(sql, val)  # 执行SQL语句
+        mysql_database.commit()  # 数据表内容更新提交语句
     return mysql_cursor.rowcount
 
 
-def insert_pure(host: str, user: str, password: str, database: str, table: str, data: list, use_unicode: bool = True):
+def insert_pure(host: str, user: str, password: str, database: str, table: str, data: list, use_unicode: bool = True,
+                pooled: bool = False):
     """ INSERT写入数据到MySQL数据库(使用纯粹SQL语句)
     :param host: <str> MySQL数据库主机的Url
     :param user: <str> MySQL数据库的访问用户名
@@ -131,21 +418,238 @@ def insert_pure(host: str, user: str, password: str, database: str, table: str,
     :param table: <str> 需要写入的MySQL数据表名称
     :param data: <list:list> 需要写入的多条记录(所有记录的字段名与第一条记录的字段名统一)
     :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
+    :param pooled: <bool> 是否使用连接池(见connect),默认为False
     :return: <bool> 写入数据是否成功
     """
     if len(data) == 0:  # 处理需要写入的记录数为0的情况
         return 0
 
-    mysql_database = mysql.connector.connect(
-        host=host, user=user, password=password, database=database, use_unicode=use_unicode)  # 链接到MySQL数据库
-    mysql_cursor = mysql_database.cursor()
-    sql = sql_insert_pure(table, data)
-    # print(sql)
-    mysql_cursor.execute(sql)  # 执行SQL语句
-    mysql_database.commit()  # 数据表内容更新提交语句
+    with connect(host, user, password, database, use_unicode, pooled) as mysql_database:  # 链接到MySQL数据库
+        mysql_cursor = mysql_database.cursor()
+        sql = sql_insert_pure(table, data)
+        # print(sql)
+        mysql_cursor.execute(sql)  # 执行SQL语句
+        mysql_database.commit()  # 数据表内容更新提交语句
+    return mysql_cursor.rowcount
+
+
+def insert_bulk(host: str, user: str, password: str, database: str, table: str, data, columns: list = None,
+                use_unicode: bool = True, chunk_rows: int = 1000, chunk_bytes: int = 1024 * 1024,
+                commit_chunks: int = 1, retry: int = 3, retry_wait: float = 1, ignore: bool = False,
+                replace: bool = False, console: bool = True, pooled: bool = False):
+    """ 分块批量INSERT写入数据到MySQL数据库(适用于大量数据)
+    数据按行数及字节数分块,每块使用一条多行VALUES的INSERT语句写入,每写入commit_chunks块提交一次;
+    出现可以重试的错误(见TRANSIENT_ERRNO:锁等待超时,死锁,连接断开)时,未提交的分块随连接关闭而回滚,之后使用新的连接重新写入这些分块,
+    因此已提交的数据不会被重复写入(提交过程中连接断开时无法确定是否提交成功,如需避免重复可为表设置唯一键并使用ignore=True)
+    :param host: <str> MySQL数据库主机的Url
+    :param user: <str> MySQL数据库的访问用户名
+    :param password: <str> MySQL数据库的访问密码
+    :param database: <str> 需要写入的MySQL数据库名称
+    :param table: <str> 需要写入的MySQL数据表名称
+    :param data: <iterable:dict> 需要写入的多条记录(可以是生成器,不需要一次性读入内存)
+    :param columns: <list:str/None> 需要写入的字段名称列表(默认为第一条记录的字段名);
+    记录中不存在的字段,若第一条记录中该字段为数值则写入0,否则写入空字符串(与sql_insert相同)
+    :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
+    :param chunk_rows: <int> 每块的最大行数
+    :param chunk_bytes: <int> 每块数据的最大字节数(估算值,应小于服务器的max_allowed_packet)
+    :param commit_chunks: <int> 每写入多少块提交一次
+    :param retry: <int> 出现可以重试的错误时的最大连续重试次数
+    :param retry_wait: <float> 重试前的等待时间(秒),第n次重试等待n*retry_wait秒
+    :param ignore: <bool> 是否使用INSERT IGNORE(忽略与唯一键重复的记录)
+    :param replace: <bool> 是否使用REPLACE(删除与唯一键重复的原有记录后写入,优先于ignore)
+    :param console: <bool> 是否将写入进度(行/秒)输出到控制台
+    :param pooled: <bool> 是否使用连接池(见connect),默认为False
+    :return: <int> 写入(提交)的记录数
+    """
+    data = iter(data)
+    first = next(data, None)
+    if first is None:  # 处理需要写入的记录数为0的情况
+        return 0
+    if columns is None:
+        columns = list(first)
+    chunk_list = _iter_insert_chunks(itertools.chain([first], data), columns, first, chunk_rows, chunk_bytes)
+
+    num = 0  # 已提交的记录数
+    pending = []  # 已写入但尚未提交的分块
+    attempt = 0  # 当前连续重试次数
+    start_time = report_time = time.monotonic()
+    while True:
+        try:
+            with connect(host, user, password, database, use_unicode, pooled) as mysql_database:  # 链接到MySQL数据库
+                mysql_cursor = mysql_database.cursor()
+                for chunk in pending:  # 重试时重新写入未提交的分块
+                    mysql_cursor.execute(sql_insert_rows(table, columns, len(chunk), ignore, replace),
+                                         _flatten(chunk))
+                for chunk in itertools.chain(chunk_list, [None]):
+                    if chunk is not None:
+                        pending.append(chunk)
+                        mysql_cursor.execute(sql_insert_rows(table, columns, len(chunk), ignore, replace),
+                                             _flatten(chunk))
+                    if pending and (chunk is None or len(pending) >= commit_chunks):
+                        mysql_database.commit()  # 数据表内容更新提交语句
+                        num += sum(len(item) for item in pending)
+                        pending = []
+                        attempt = 0
+                        if console and time.monotonic() - report_time >= 10:
+                            report_time = time.monotonic()
+                            print("[Info] 已写入 " + str(num) + " 行(" +
+                                  str(int(num / (report_time - start_time))) + " 行/秒)")
+                mysql_cursor.close()
+            break
+        except mysql.connector.Error as e:
+            if not _is_transient(e) or attempt >= retry:
+                raise
+            attempt += 1
+            if console:
+                print("[Warning] MySQL写入出错,第" + str(attempt) + "次重试(未提交 " +
+                      str(sum(len(item) for item in pending)) + " 行):" + str(e))
+            time.sleep(retry_wait * attempt)
+    if console:
+        print("[Info] 写入完成:共 " + str(num) + " 行(" +
+              str(int(num / max(time.monotonic() - start_time, 1e-6))) + " 行/秒)")
+    return num
+
+
+def load_csv(host: str, user: str, password: str, database: str, table: str, path: str, column_name: list,
+             table_columns: list = None, encoding: str = None, iNn_Column_name: list = None, use_unicode: bool = True,
+             local_infile: bool = True, replace: bool = False, console: bool = True, pooled: bool = False,
+             **kwargs):
+    """ 将csv文件中部分列的数据写入MySQL数据表
+    读取行及数据校验规则与enhance_csv.get_data_list相同;读取结果先写入临时TSV文件,再通过LOAD DATA LOCAL INFILE一次写入,
+    若服务器或客户端不允许LOAD DATA LOCAL INFILE,则改为使用insert_bulk分块写入;csv中不存在的列写入NULL
+    与唯一键重复的记录在两种写入方式下处理相同:默认忽略(LOAD DATA ... IGNORE / INSERT IGNORE,不报错,已有记录保持不变),
+    replace=True时替换已有记录(LOAD DATA ... REPLACE / REPLACE INTO);
+    注意IGNORE同时会将数据类型不符,超出长度等错误降级为警告(MySQL对LOAD DATA LOCAL的默认处理)
+    :param host: <str> MySQL数据库主机的Url
+    :param user: <str> MySQL数据库的访问用户名
+    :param password: <str> MySQL数据库的访问密码
+    :param database: <str> 需要写入的MySQL数据库名称
+    :param table: <str> 需要写入的MySQL数据表名称
+    :param path: <str> csv文件路径地址
+    :param column_name: <list:str> 需要读取的csv列名列表
+    :param table_columns: <list:str/None> 各列写入的字段名称列表(默认与csv列名相同)
+    :param encoding: <str> csv文件读取使用的编码格式
+    :param iNn_Column_name: <list:str> 不允许为空值的csv列名列表
+    :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数，默认为True
+    :param local_infile: <bool> 是否尝试使用LOAD DATA LOCAL INFILE(False=直接使用insert_bulk)
+    :param replace: <bool> 与唯一键重复的记录的处理方式:True=替换已有记录,False=忽略(默认)
+    :param console: <bool> 是否将警告及写入进度输出到控制台
+    :param pooled: <bool> 使用insert_bulk写入时是否使用连接池(LOAD DATA需要单独建立允许读取本地文件的连接)
+    :param kwargs: 使用insert_bulk写入时的其他参数(chunk_rows,chunk_bytes,commit_chunks,retry,retry_wait)
+    :return: <int> 写入的记录数(LOAD DATA为受影响的行数,不含被忽略的记录;insert_bulk为提交的记录数)
+    """
+    if table_columns is None:
+        table_columns = column_name
+
+    if local_infile:
+        start_time = time.monotonic()
+        temp_file = tempfile.NamedTemporaryFile("w", encoding="UTF-8", newline="", suffix=".tsv", delete=False)
+        try:
+            with temp_file:
+                for row in _iter_csv_rows(path, column_name, encoding, console, iNn_Column_name):
+                    temp_file.write("\t".join("\\N" if value is None else value.translate(TSV_ESCAPE)
+                                              for value in row) + "\n")
+            num = _load_tsv(host, user, password, database, table, temp_file.name, table_columns, use_unicode,
+                            replace)
+            if console:
+                print("[Info] LOAD DATA写入完成:共 " + str(num) + " 行(" +
+                      str(int(num / max(time.monotonic() - start_time, 1e-6))) + " 行/秒)")
+            return num
+        except mysql.connector.Error as e:
+            if getattr(e, "errno", None) not in LOCAL_INFILE_ERRNO:
+                raise
+            if console:
+                print("[Warning] 不允许使用LOAD DATA LOCAL INFILE,改为分块INSERT写入:" + str(e))
+        finally:
+            os.remove(temp_file.name)
+
+    data = (dict(zip(table_columns, row)) for row in _iter_csv_rows(path, column_name, encoding, console,
+                                                                     iNn_Column_name))
+    return insert_bulk(host, user, password, database, table, data, columns=table_columns, use_unicode=use_unicode,
+                       ignore=not replace, replace=replace, console=console, pooled=pooled, **kwargs)
+
+
+def _iter_csv_rows(path, column_name, encoding, console, iNn_Column_name):
+    """ 读取csv文件中部分列的数据,每行均返回列表(load_csv的读取过程)
+    :param path: <str> csv文件路径地址
+    :param column_name: <list:str> 需要读取的csv列名列表
+    :param encoding: <str> csv文件读取使用的编码格式
+    :param console: <bool> 是否将警告输出到控制台
+    :param iNn_Column_name: <list:str> 不允许为空值的csv列名列表
+    :return: <generator> 依次返回各行数据:[数据,数据,...](csv中不存在的列为None)
+    """
+    row_list = enhance_csv.iter_data_list(path, column_name, encoding=encoding, console=console,
+                                          iNn_Column_name=iNn_Column_name)
+    if len(column_name) == 1:
+        return ([value] for value in row_list)
+    return row_list
+
+
+def _load_tsv(host, user, password, database, table, tsv_path, table_columns, use_unicode, replace=False):
+    """ 通过LOAD DATA LOCAL INFILE将TSV文件写入MySQL数据表(load_csv的写入过程)
+    :param host: <str> MySQL数据库主机的Url
+    :param user: <str> MySQL数据库的访问用户名
+    :param password: <str> MySQL数据库的访问密码
+    :param database: <str> 需要写入的MySQL数据库名称
+    :param table: <str> 需要写入的MySQL数据表名称
+    :param tsv_path: <str> TSV文件路径(UTF-8编码,制表符分隔,换行符结尾,特殊字符按TSV_ESCAPE转义,空值为\\N)
+    :param table_columns: <list:str> 各列写入的字段名称列表
+    :param use_unicode: <bool> 是否设置MySQL数据库链接时的use_unicode参数
+    :param replace: <bool> 与唯一键重复的记录的处理方式:True=REPLACE(替换已有记录),False=IGNORE(忽略)
+    :return: <int> 写入的记录数
+    """
+    sql = "LOAD DATA LOCAL INFILE %s " + ("REPLACE" if replace else "IGNORE") + " INTO TABLE " + table + \
+          " CHARACTER SET utf8mb4 " + \
+          "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' (" + \
+          ",".join("`" + column + "`" for column in table_columns) + ")"
+    with connect(host, user, password, database, use_unicode, allow_local_infile=True) as mysql_database:
+        mysql_cursor = mysql_database.cursor()
+        mysql_cursor.execute(sql, (tsv_path,))
+        mysql_database.commit()  # 数据表内容更新提交语句
+        mysql_cursor.close()
     return mysql_cursor.rowcount
 
 
+def _is_transient(error):
+    """ 判断MySQL错误是否可以重试(错误代码在TRANSIENT_ERRNO中:锁等待超时,死锁,连接断开)
+    :param error: <mysql.connector.Error> MySQL错误
+    :return: <bool> 是否可以重试:True=是,False=否
+    """
+    return getattr(error, "errno", None) in TRANSIENT_ERRNO
+
+
+def _iter_insert_chunks(data, columns, first, chunk_rows, chunk_bytes):
+    """ 将需要写入的记录转换为各字段的值并按行数及字节数分块(insert_bulk的分块过程)
+    :param data: <iterable:dict> 需要写入的多条记录
+    :param columns: <list:str> 需要写入的字段名称列表
+    :param first: <dict> 第一条记录(用于确定不存在的字段的写入值)
+    :param chunk_rows: <int> 每块的最大行数
+    :param chunk_bytes: <int> 每块数据的最大字节数(按各值转换为字符串后的UTF-8长度估算,每块至少包含一行)
+    :return: <generator> 依次返回各分块:[(值,值,...),(值,值,...)]
+    """
+    default_list = [0 if isinstance(first.get(column), (int, float)) else "" for column in columns]
+    chunk, size = [], 0
+    for record in data:
+        row = tuple(record.get(column, default) for column, default in zip(columns, default_list))
+        row_bytes = sum(len(value.encode("UTF-8")) if isinstance(value, str) else len(str(value)) for value in row)
+        row_bytes += 3 * len(row) + 2  # 引号,逗号及括号
+        if chunk and (len(chunk) >= chunk_rows or size + row_bytes > chunk_bytes):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(row)
+        size += row_bytes
+    if chunk:
+        yield chunk
+
+
+def _flatten(chunk):
+    """ 将分块中各行的值合并为一个列表(多行VALUES语句的参数)
+    :param chunk: <list:tuple> 分块中各行的值
+    :return: <list> 合并后的参数列表
+    """
+    return list(itertools.chain.from_iterable(chunk))
+
+
 def sql_select(table: str, columns: list, where: str = ""):
     """ [生成SQL语句]SELECT语句
     :param table: <str> 需要SELECT的表单名称
@@ -201,6 +705,25 @@ def sql_insert(table: str, data: list):
     return sql, val
 
 
+def sql_insert_rows(table: str, columns: list, row_num: int, ignore: bool = False, replace: bool = False):
+    """ [生成SQL语句]多行VALUES的INSERT语句(使用%s占位符,参数为各行的值按顺序合并的列表)
+    :param table: <str> 需要写入的MySQL数据表名称
+    :param columns: <list:str> 需要写入的字段名称列表
+    :param row_num: <int> 写入的行数
+    :param ignore: <bool> 是否使用INSERT IGNORE
+    :param replace: <bool> 是否使用REPLACE INTO(优先于ignore)
+    :return: <str> 生成完成的INSERT(MySQL)语句
+    """
+    value_part = "(" + ",".join(["%s"] * len(columns)) + ")"
+    column_part = ",".join("`" + column + "`" for column in columns)
+    if replace:
+        verb = "REPLACE INTO "
+    else:
+        verb = "INSERT IGNORE INTO " if ignore else "INSERT INTO "
+    return verb + table + " (" + column_part + ") VALUES " + \
+        ",".join([value_part] * row_num)
+
+
 def sql_insert_pure(table: str, data: list):
     """ [生成SQL语句]INSERT语句(纯粹SQL语句,部分sql和val)
     :param table: <str> 需要写入的MySQL数据表名称
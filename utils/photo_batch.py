@@ -0,0 +1,182 @@
+# coding=utf-8
+
+"""
+图片处理工具包：批量处理(多进程并行处理目录中的所有图片)
+"""
+
+import csv
+import glob
+import json
+import multiprocessing
+import os
+
+from PIL import Image
+
+from utils import file
+from utils import photoshop
+
+# 支持批量处理的图片文件扩展名
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tif", ".tiff", ".webp")
+
+# 批量处理任务名称
+TASKS = ("color_folded", "color_count", "dcy_background")
+
+# 工作进程中缓存的背景图(dcy_background任务的所有图片共用同一张背景图,每个进程只读取一次)
+_background_cache = {}
+
+
+def list_images(source, extensions=IMAGE_EXTENSIONS):
+    """ 列出需要批量处理的图片文件
+    :param source: <str> 图片所在目录(包含所有子目录)或glob通配符路径,例如: D:/photo/*.jpg
+    :param extensions: <tuple:str> 图片文件扩展名(小写)
+    :return: <list:str> 按路径排序的图片文件路径列表
+    """
+    if os.path.isdir(source):
+        path_list = []
+        for root, _, file_names in os.walk(source):
+            for file_name in file_names:
+                if os.path.splitext(file_name)[1].lower() in extensions:
+                    path_list.append(os.path.join(root, file_name))
+    else:
+        path_list = [path for path in glob.glob(source, recursive=True)
+                     if os.path.splitext(path)[1].lower() in extensions]
+    return sorted(path_list)
+
+
+def finished_paths(output):
+    """ 读取结果文件中已经处理成功的图片路径(用于中断后继续处理)
+    程序中断时最后一行可能只写入了一部分,该行会被从结果文件中截去,对应图片将重新处理;
+    处理失败(error不为空)的图片不计入,重新运行时会再次处理(成功后结果文件中同一图片会有失败及成功两条记录)
+    :param output: <str> 结果文件路径(.csv或.jsonl)
+    :return: <set:str> 已经处理成功的图片路径
+    """
+    if not file.is_exist(output):
+        return set()
+    with open(output, "rb+") as fr:
+        content = fr.read()
+        complete = content.rfind(b"\n") + 1
+        if complete < len(content):
+            fr.truncate(complete)
+    lines = content[:complete].decode("UTF-8").splitlines()
+    if output.lower().endswith(".csv"):
+        return {row[0] for row in csv.reader(lines[1:]) if row and (len(row) < 3 or row[2] == "")}
+    return {item["path"] for item in map(json.loads, filter(None, lines)) if item.get("error") is None}
+
+
+def source_root(source, path_list):
+    """ 获取批量处理图片的根目录(写入结果图片时保持图片相对于根目录的路径)
+    :param source: <str> 图片所在目录或glob通配符路径,见list_images
+    :param path_list: <list:str> 图片文件路径列表
+    :return: <str> 根目录:source为目录时即为该目录,否则为所有图片所在目录的共同上级目录
+    """
+    if os.path.isdir(source):
+        return source
+    if len(path_list) == 0:
+        return ""
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in path_list])
+
+
+def output_path(path, root, output_dir):
+    """ 获取图片处理结果的写入路径:在写入目录下保持图片相对于根目录的路径,并在原文件名(含扩展名)后添加.png
+    例如根目录为D:/photo时,D:/photo/a/x.jpg写入output_dir/a/x.jpg.png,不同目录或不同扩展名的同名图片不会互相覆盖
+    :param path: <str> 图片文件路径
+    :param root: <str> 图片的根目录
+    :param output_dir: <str> 写入目录
+    :return: <str> 写入路径
+    """
+    return os.path.join(output_dir, os.path.relpath(os.path.abspath(path), os.path.abspath(root)) + ".png")
+
+
+def process_image(path, task, params):
+    """ 处理单张图片(在工作进程中执行)
+    :param path: <str> 图片文件路径
+    :param task: <str> 任务名称,见TASKS
+    :param params: <dict> 任务参数:
+    color_folded: 与photoshop.color_folded_array的参数相同(num,posterize,percent,threshold)
+    color_count: colors=目标颜色列表,vague=颜色模糊程度
+    dcy_background: background=背景图路径,output_dir=剔除背景后图片的写入目录,
+    source_root=图片的根目录(写入路径见output_path,默认为图片所在目录;run会自动设置)
+    :return: <dict> 处理结果,例如: {"path": 图片路径, "result": 处理结果, "error": None}
+    """
+    try:
+        with Image.open(path) as image:
+            if task == "color_folded":
+                color_dict = photoshop.color_folded_array(image, **params)
+                result = [[r, g, b, value] for (r, g, b), value in color_dict.items()]
+            elif task == "color_count":
+                result = photoshop.color_count_array(image, *params["colors"], vague=params.get("vague", 0))
+            elif task == "dcy_background":
+                background_path = params["background"]
+                if background_path not in _background_cache:
+                    _background_cache[background_path] = Image.open(background_path).convert("RGB")
+                picture = photoshop.dcy_background_array(image.convert("RGB"), _background_cache[background_path],
+                                                         tile_height=params.get("tile_height"))
+                if picture is None:
+                    return {"path": path, "result": None, "error": "目标图和背景图的宽高不同"}
+                result = output_path(path, params.get("source_root", os.path.dirname(path)), params["output_dir"])
+                os.makedirs(os.path.dirname(result), exist_ok=True)
+                picture.save(result)
+            else:
+                return {"path": path, "result": None, "error": "未知的任务名称:" + str(task)}
+        return {"path": path, "result": result, "error": None}
+    except Exception as e:
+        return {"path": path, "result": None, "error": repr(e)}
+
+
+def _process_image_args(args):
+    """ 解包参数并调用process_image(供进程池使用)
+    :param args: <tuple> (图片文件路径,任务名称,任务参数)
+    :return: <dict> process_image的返回结果
+    """
+    return process_image(*args)
+
+
+def run(source, task, output, processes=None, chunk_size=16, console=True, **params):
+    """ 多进程批量处理目录中的所有图片,每处理完成一张图片即写入一行结果
+    若结果文件已经存在,则跳过其中已经处理成功的图片(程序中断后可以直接重新运行,处理失败的图片会重新处理)
+    注意:在Windows中调用本函数的脚本需要放在 if __name__ == "__main__": 之下
+    :param source: <str> 图片所在目录或glob通配符路径,见list_images
+    :param task: <str> 任务名称:"color_folded","color_count","dcy_background"
+    :param output: <str> 结果文件路径:扩展名为.csv时写入csv(列:path,result,error;result为json字符串),否则写入jsonl
+    :param processes: <int/None> 进程数量(默认为CPU核数)
+    :param chunk_size: <int> 每次分配给一个进程的图片数量
+    :param console: <bool> 是否将处理进度输出到控制台
+    :param params: 任务参数,见process_image
+    :return: <int> 本次处理的图片数量
+    """
+    if task not in TASKS:
+        print("[Warning] 未知的任务名称(" + str(task) + ")")
+        return 0
+    if task == "dcy_background":
+        os.makedirs(params["output_dir"], exist_ok=True)
+
+    finished = finished_paths(output)
+    all_path_list = list_images(source)
+    path_list = [path for path in all_path_list if path not in finished]
+    if task == "dcy_background":  # 根目录按全部图片计算,中断后重新运行时写入路径不变
+        params.setdefault("source_root", source_root(source, all_path_list))
+    if console:
+        print("[Info] 共需处理图片 " + str(len(path_list)) + " 张(已跳过处理成功的图片 " + str(len(finished)) + " 张)")
+    if len(path_list) == 0:
+        return 0
+
+    is_csv = output.lower().endswith(".csv")
+    write_title = is_csv and (not file.is_exist(output) or os.path.getsize(output) == 0)
+    num = 0
+    with open(output, "a", encoding="UTF-8", newline="") as fw, multiprocessing.Pool(processes) as pool:
+        writer = csv.writer(fw) if is_csv else None
+        if write_title:
+            writer.writerow(["path", "result", "error"])
+        tasks = ((path, task, params) for path in path_list)
+        for item in pool.imap_unordered(_process_image_args, tasks, chunksize=chunk_size):
+            if is_csv:
+                writer.writerow([item["path"], json.dumps(item["result"], ensure_ascii=False), item["error"] or ""])
+            else:
+                fw.write(json.dumps(item, ensure_ascii=False) + "\n")
+            fw.flush()
+            num += 1
+            if item["error"] is not None and console:
+                print("[Warning] 图片处理失败(" + item["path"] + "):" + item["error"])
+            if console and num % 1000 == 0:
+                print("[Info] 已处理图片 " + str(num) + "/" + str(len(path_list)) + " 张")
+    return num
@@ -0,0 +1,197 @@
+# coding=utf-8
+
+"""
+图片处理工具包：缩略图指纹索引(批量查找相似图片)
+"""
+
+import json
+import os
+
+import numpy as np
+from PIL import Image
+
+from utils import file
+from utils import photoshop
+
+
+def fingerprint(image, size=12):
+    """ 计算图片的缩略图指纹(与photo_differ_small使用相同的缩小图)
+    :param image: <PIL.Image> 图片对象
+    :param size: <int> 缩小缩略图像素数
+    :return: <numpy.ndarray> 长度为size*size*3的uint8向量
+    """
+    return photoshop.image_array(image.resize((size, size))).ravel()
+
+
+class PhotoIndex:
+    """
+    缩略图指纹索引:每张图片只计算一次指纹,所有指纹保存在一个uint8矩阵中并可以写入磁盘,
+    相似度与photo_differ_small相同(各像素各通道差值绝对值之和/765,越小越相似)
+    构造方法:PhotoIndex(size=12) 或 PhotoIndex.load(path)
+    添加图片方法:index.add(path) / index.update(path_list)
+    查询方法:index.top_k(image, k) / index.pairs(threshold)
+    """
+
+    def __init__(self, size=12):
+        """
+        缩略图指纹索引:构造器
+        :param size: <int> 缩小缩略图像素数
+        """
+        self.size = size
+        self.keys = []  # 各指纹对应的图片标识(通常为图片路径)
+        self.key_set = set()
+        self.matrix = np.zeros((0, size * size * 3), dtype=np.uint8)  # 指纹矩阵(每行一张图片)
+        self.pending = []  # 尚未合并到指纹矩阵中的指纹
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add_image(self, key, image):
+        """ 添加一张图片的指纹(若标识已经存在则跳过)
+        :param key: <str> 图片标识
+        :param image: <PIL.Image> 图片对象
+        :return: <bool> 是否添加成功
+        """
+        if key in self.key_set:
+            return False
+        self.pending.append(fingerprint(image, self.size))
+        self.keys.append(key)
+        self.key_set.add(key)
+        return True
+
+    def add(self, path):
+        """ 读取图片文件并添加其指纹(若路径已经存在则跳过,不会重复读取图片)
+        :param path: <str> 图片文件路径
+        :return: <bool> 是否添加成功
+        """
+        if path in self.key_set:
+            return False
+        try:
+            with Image.open(path) as image:
+                return self.add_image(path, image)
+        except OSError:
+            print("[Warning] 读取图片失败(" + path + ")")
+            return False
+
+    def update(self, path_list):
+        """ 批量读取图片文件并添加其指纹
+        :param path_list: <list:str> 图片文件路径列表
+        :return: <int> 新添加的图片数量
+        """
+        return sum(1 for path in path_list if self.add(path))
+
+    def fingerprints(self):
+        """ 获取完整的指纹矩阵(合并尚未合并的指纹)
+        :return: <numpy.ndarray> 形状为(图片数量,size*size*3)的uint8矩阵
+        """
+        if self.pending:
+            self.matrix = np.concatenate([np.asarray(self.matrix), np.stack(self.pending)])
+            self.pending = []
+        return self.matrix
+
+    def save(self, path):
+        """ 将索引写入磁盘(指纹矩阵写入path.npy,图片标识写入path.json;可以写入load读取的同一路径)
+        :param path: <str> 索引文件路径(不含扩展名)
+        :return: <None>
+        """
+        if isinstance(self.fingerprints(), np.memmap):  # 以内存映射方式读取的矩阵可能就是要写入的文件,先读入内存
+            self.matrix = np.array(self.matrix)
+        # 先写入同一目录中的临时文件再替换,写入过程中出错不会损坏原索引文件
+        with open(path + ".npy.tmp", "wb") as fw:
+            np.save(fw, self.matrix)
+        with open(path + ".json.tmp", "w", encoding="UTF-8") as fw:
+            json.dump({"size": self.size, "keys": self.keys}, fw, ensure_ascii=False)
+        os.replace(path + ".npy.tmp", path + ".npy")
+        os.replace(path + ".json.tmp", path + ".json")
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """ 从磁盘读取索引(若索引文件不存在则返回空索引)
+        :param path: <str> 索引文件路径(不含扩展名)
+        :param mmap: <bool> 是否以内存映射方式读取指纹矩阵(只读,不会将整个矩阵读入内存)
+        :return: <PhotoIndex> 读取完成的索引
+        """
+        if not file.is_exist(path + ".npy") or not file.is_exist(path + ".json"):
+            print("[Warning] 未找到索引文件(" + path + ")")
+            return cls()
+        info = file.as_json(path + ".json")
+        index = cls(size=info["size"])
+        index.keys = info["keys"]
+        index.key_set = set(index.keys)
+        index.matrix = np.load(path + ".npy", mmap_mode="r" if mmap else None)
+        return index
+
+    def distance(self, image, chunk_size=65536):
+        """ 计算图片与索引中所有图片的相似度
+        :param image: <PIL.Image/numpy.ndarray> 图片对象或图片指纹
+        :param chunk_size: <int> 每批计算的图片数量
+        :return: <numpy.ndarray> 与各图片的相似度(顺序与keys相同)
+        """
+        target = image if isinstance(image, np.ndarray) else fingerprint(image, self.size)
+        target = target.astype(np.int16)
+        matrix = self.fingerprints()
+        result = np.empty(len(matrix), dtype=np.int32)
+        for start in range(0, len(matrix), chunk_size):
+            result[start:start + chunk_size] = np.abs(matrix[start:start + chunk_size] - target).sum(axis=1)
+        return result / 765
+
+    def top_k(self, image, k=10):
+        """ 查找索引中与目标图片最相似的k张图片
+        :param image: <PIL.Image/numpy.ndarray> 图片对象或图片指纹
+        :param k: <int> 返回的图片数量
+        :return: <list> [(图片标识,相似度),...],按相似度从小到大排序
+        """
+        distance = self.distance(image)
+        if 0 < k < len(distance):
+            candidate = np.argpartition(distance, k - 1)[:k]
+        else:
+            candidate = np.arange(len(distance))
+        candidate = candidate[np.argsort(distance[candidate], kind="stable")]
+        return [(self.keys[i], float(distance[i])) for i in candidate]
+
+    def pairs(self, threshold, block_size=64, window_size=512):
+        """ 查找索引中所有相似度小于阈值的图片对
+        先按指纹各值之和排序,由于两张图片的差值绝对值之和不小于其指纹和之差,
+        每张图片只需与指纹和相差小于阈值的图片比较,而不必两两比较所有图片
+        :param threshold: <float> 相似度阈值
+        :param block_size: <int> 每批比较的图片数量
+        :param window_size: <int> 每批比较的候选图片数量(block_size*window_size*size*size*3决定内存占用)
+        :return: <list> [(图片标识1,图片标识2,相似度),...]
+        """
+        matrix = self.fingerprints()
+        limit = threshold * 765
+        total = matrix.sum(axis=1, dtype=np.int64)
+        order = np.argsort(total, kind="stable")
+        total = total[order]
+        result = []
+        for start in range(0, len(order), block_size):
+            block = np.asarray(matrix[order[start:start + block_size]], dtype=np.int16)
+            block_total = total[start:start + block_size]
+            end = int(np.searchsorted(total, block_total[-1] + limit, side="left"))
+            for window_start in range(start, end, window_size):
+                window_order = order[window_start:min(window_start + window_size, end)]
+                window = np.asarray(matrix[window_order], dtype=np.int16)
+                distance = np.abs(block[:, None, :] - window[None, :, :]).sum(axis=2)
+                # 只保留每对图片中排序靠前者与靠后者的组合,避免重复
+                position = np.arange(start, start + len(block))[:, None] < np.arange(
+                    window_start, window_start + len(window))[None, :]
+                for i, j in zip(*np.nonzero((distance < limit) & position)):
+                    result.append((self.keys[order[start + i]], self.keys[window_order[j]],
+                                   float(distance[i, j]) / 765))
+        return result
+
+
+def build(path_list, index_path=None, size=12):
+    """ 批量计算图片指纹并生成索引(若索引文件已经存在,则只计算新增图片的指纹)
+    :param path_list: <list:str> 图片文件路径列表
+    :param index_path: <str/None> 索引文件路径(不含扩展名);None=不写入磁盘
+    :param size: <int> 缩小缩略图像素数
+    :return: <PhotoIndex> 生成完成的索引
+    """
+    if index_path is not None and file.is_exist(index_path + ".npy"):
+        index = PhotoIndex.load(index_path, mmap=False)
+    else:
+        index = PhotoIndex(size=size)
+    if index.update(path_list) > 0 and index_path is not None:
+        index.save(index_path)
+    return index
@@ -4,8 +4,10 @@
 图片处理工具包
 """
 
+import functools
 import math
 
+import numpy as np
 from PIL import Image
 
 
@@ -41,6 +43,114 @@ def mixed_mode_multiply(code_1, code_2):
     return math.floor(code_1 * code_2 / 255)
 
 
+def mixed_mode_screen(code_1, code_2):
+    """ [图层-混合模式-滤色]各点的RGB转换算法
+    :param code_1: 第一个图层RGB的值
+    :param code_2: 第二个图层RGB的值
+    """
+    return 255 - math.floor((255 - code_1) * (255 - code_2) / 255)
+
+
+def mixed_mode_overlay(code_1, code_2):
+    """ [图层-混合模式-叠加]各点的RGB转换算法
+    :param code_1: 基色点RGB的值
+    :param code_2: 混合色点RGB的值
+    """
+    if code_1 < 128:
+        return math.floor(2 * code_1 * code_2 / 255)
+    return 255 - math.floor(2 * (255 - code_1) * (255 - code_2) / 255)
+
+
+def mixed_mode_hard_light(code_1, code_2):
+    """ [图层-混合模式-强光]各点的RGB转换算法
+    :param code_1: 基色点RGB的值
+    :param code_2: 混合色点RGB的值
+    """
+    return mixed_mode_overlay(code_2, code_1)
+
+
+def mixed_mode_soft_light(code_1, code_2):
+    """ [图层-混合模式-柔光]各点的RGB转换算法
+    :param code_1: 基色点RGB的值
+    :param code_2: 混合色点RGB的值
+    """
+    a, b = code_1 / 255, code_2 / 255
+    if b <= 0.5:
+        return math.floor((a - (1 - 2 * b) * a * (1 - a)) * 255)
+    d = ((16 * a - 12) * a + 4) * a if a <= 0.25 else math.sqrt(a)
+    return math.floor((a + (2 * b - 1) * (d - a)) * 255)
+
+
+def mixed_mode_color_dodge(code_1, code_2):
+    """ [图层-混合模式-颜色减淡]各点的RGB转换算法
+    :param code_1: 基色点RGB的值
+    :param code_2: 混合色点RGB的值
+    """
+    if code_2 >= 255:
+        return 255
+    return min(255, math.floor(code_1 * 255 / (255 - code_2)))
+
+
+def mixed_mode_color_burn(code_1, code_2):
+    """ [图层-混合模式-颜色加深]各点的RGB转换算法
+    :param code_1: 基色点RGB的值
+    :param code_2: 混合色点RGB的值
+    """
+    if code_1 >= 255:
+        return 255
+    if code_2 <= 0:
+        return 0
+    return max(0, 255 - math.floor((255 - code_1) * 255 / code_2))
+
+
+def mixed_mode_linear_dodge(code_1, code_2):
+    """ [图层-混合模式-线性减淡(添加)]各点的RGB转换算法
+    :param code_1: 第一个图层RGB的值
+    :param code_2: 第二个图层RGB的值
+    """
+    return min(255, code_1 + code_2)
+
+
+def mixed_mode_linear_burn(code_1, code_2):
+    """ [图层-混合模式-线性加深]各点的RGB转换算法
+    :param code_1: 第一个图层RGB的值
+    :param code_2: 第二个图层RGB的值
+    """
+    return max(0, code_1 + code_2 - 255)
+
+
+def mixed_mode_lighten(code_1, code_2):
+    """ [图层-混合模式-变亮]各点的RGB转换算法
+    :param code_1: 第一个图层RGB的值
+    :param code_2: 第二个图层RGB的值
+    """
+    return max(code_1, code_2)
+
+
+def mixed_mode_darken(code_1, code_2):
+    """ [图层-混合模式-变暗]各点的RGB转换算法
+    :param code_1: 第一个图层RGB的值
+    :param code_2: 第二个图层RGB的值
+    """
+    return min(code_1, code_2)
+
+
+def mixed_mode_exclusion(code_1, code_2):
+    """ [图层-混合模式-排除]各点的RGB转换算法
+    :param code_1: 第一个图层RGB的值
+    :param code_2: 第二个图层RGB的值
+    """
+    return code_1 + code_2 - math.floor(2 * code_1 * code_2 / 255)
+
+
+def mixed_mode_subtract(code_1, code_2):
+    """ [图层-混合模式-减去]各点的RGB转换算法
+    :param code_1: 基色点RGB的值
+    :param code_2: 混合色点RGB的值
+    """
+    return max(0, code_1 - code_2)
+
+
 def color_folded(image, num=100, posterize=None, percent=False, threshold=None):
     """ 汇总统计图片中出现频率最高的颜色
     :param image:(PIL.Image)图片对象
@@ -84,6 +194,76 @@ def color_folded(image, num=100, posterize=None, percent=False, threshold=None):
     return color_dict
 
 
+def image_array(image):
+    """ 读取图片的像素缓冲区为NumPy数组(仅读取一次,替代逐点getpixel)
+    :param image: <PIL.Image> 图片对象(非RGB模式的图片会先转换为RGB模式)
+    :return: <numpy.ndarray> 形状为(高,宽,3)的uint8数组
+    """
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return np.asarray(image)
+
+
+def pack_rgb(array):
+    """ 将RGB数组编码为256进制RGB颜色(r * 65536 + g * 256 + b)
+    :param array: <numpy.ndarray> 最后一维为RGB三通道的uint8数组
+    :return: <numpy.ndarray> 编码完成的uint32数组(形状为去掉最后一维的形状)
+    """
+    array = array.astype(np.uint32)
+    return (array[..., 0] << 16) | (array[..., 1] << 8) | array[..., 2]
+
+
+@functools.lru_cache(maxsize=None)
+def posterize_table(level):
+    """ [图像-调整-色调分离]的查找表(由posterize_code逐个计算0-255的结果)
+    :param level: <int> 色阶
+    :return: <numpy.ndarray> 长度为256的uint8查找表
+    """
+    table = np.array([posterize_code(code, level) for code in range(256)], dtype=np.uint8)
+    table.flags.writeable = False
+    return table
+
+
+def color_folded_array(image, num=100, posterize=None, percent=False, threshold=None):
+    """ 汇总统计图片中出现频率最高的颜色(NumPy数组实现)
+    返回结果与color_folded完全相同(包括频次相同颜色之间的先后顺序),但仅读取一次像素缓冲区,
+    色调分离使用查找表,颜色频次使用np.unique统计,并用部分排序选出出现频率最高的颜色
+    :param image:(PIL.Image)图片对象
+    :param num:(int)输出出现频率最高的颜色数量
+    :param posterize:(int/None)是否开启色调分离.None=关闭,int=开启后的色阶数
+    :param percent:(bool)输出结果频次/频率选择:True=频率,False=频次
+    :param threshold:(int/None)是否按阈值筛选颜色:None=关闭,float=输出要求最低出现频率的阈值
+    """
+    width, height = image.size  # 读取图片宽高尺寸
+    total_pixel = width * height
+
+    array = image_array(image)
+    if posterize is not None:
+        array = posterize_table(posterize)[array]  # 通过查找表完成色调分离
+
+    # 按color_folded的遍历顺序(先x后y)展开,使频次相同的颜色可以按首次出现的位置排序
+    codes = pack_rgb(array).T.ravel()
+    color_code, first_index, color_num = np.unique(codes, return_index=True, return_counts=True)
+
+    # 部分排序:仅保留频次不低于第num名频次的颜色,再对其完整排序
+    if 0 < num < len(color_num):
+        kth = np.partition(color_num, len(color_num) - num)[len(color_num) - num]
+        keep = np.flatnonzero(color_num >= kth)
+        color_code, first_index, color_num = color_code[keep], first_index[keep], color_num[keep]
+    order = np.lexsort((first_index, -color_num.astype(np.int64)))[:num]
+
+    color_dict = {}  # 定义最终的图片颜色频次字典(key=(r,G,B),value=在图片中出现频次)
+    for code, count in zip(color_code[order].tolist(), color_num[order].tolist()):
+        if threshold is None or (count / total_pixel) > threshold:
+            color = (code >> 16, (code >> 8) & 255, code & 255)
+            if percent:
+                color_dict[color] = count / total_pixel
+            else:
+                color_dict[color] = count
+
+    return color_dict
+
+
 def color_count(image, *colors, vague=0):
     """ 统计某种颜色的出现频率
     :param image: <PIL.Image> 图片对象
@@ -103,6 +283,34 @@ def color_count(image, *colors, vague=0):
     return count
 
 
+def color_count_array(image, *colors, vague=0):
+    """ 统计某种颜色的出现频率(NumPy数组实现,每次遍历同时统计64种目标颜色)
+    为每个通道预先计算256项的位掩码查找表(第i位表示该通道值与第i种目标颜色的误差不超过vague),
+    每个像素的三个通道查表后按位与,即可同时得到该像素匹配的全部目标颜色
+    :param image: <PIL.Image> 图片对象
+    :param colors: <(int,int,int),...> 需要统计出现频率的颜色RGB值
+    :param vague: <int> 颜色模糊程度(RGB各通道允许误差量)
+    :return <list:int> 在图片中各目标颜色点的数量,与color_count相同
+    """
+    array = image_array(image)
+    code = np.arange(256, dtype=np.int64)
+    count = []
+    for start in range(0, len(colors), 64):
+        block = np.array(colors[start:start + 64], dtype=np.int64).reshape(-1, 3)
+        bit = np.uint64(1) << np.arange(len(block), dtype=np.uint64)
+
+        # 各通道的位掩码查找表,形状:(256,)
+        table = [np.bitwise_or.reduce(np.where(np.abs(code[:, None] - block[None, :, channel]) <= vague, bit, 0),
+                                      axis=1).astype(np.uint64) for channel in range(3)]
+        mask = table[0][array[..., 0]] & table[1][array[..., 1]] & table[2][array[..., 2]]
+
+        # 匹配了目标颜色的像素通常较少,仅对非0掩码统计频次,再按位展开累加到各目标颜色
+        mask_value, mask_num = np.unique(mask[mask != 0], return_counts=True)
+        mask_bit = (mask_value[:, None] & bit[None, :]) != 0
+        count.extend((mask_num @ mask_bit).tolist())
+    return count
+
+
 def color_first(image, color, vague=0):
     """ 统计某种颜色出现的最靠近左上角的位置坐标
     :param image: <PIL.Image> 图片对象
@@ -129,6 +337,59 @@ def color_first(image, color, vague=0):
     return None
 
 
+def color_first_array(image, color, vague=0, box=None, stride=None):
+    """ 统计某种颜色出现的最靠近左上角的位置坐标(NumPy数组实现)
+    查找顺序与color_first相同:到左上角的数值距离(x+y)最小者优先,距离相同时x最小者优先;
+    从左上角开始按边长翻倍的正方形区域逐步扩大查找范围,找到结果即停止,无需检查整张图片
+    :param image: <PIL.Image> 图片对象
+    :param color: <int,int,int> 需要查找颜色的RGB值
+    :param vague: <int> 颜色模糊程度(RGB各通道允许误差量)
+    :param box: <(int,int,int,int)/None> 查找区域(左,上,右,下),与PIL.Image.crop的参数相同;None=整张图片
+    :param stride: <int/None> 粗查步长:先每隔stride个像素抽样查找,以抽样结果的距离为上限再精确查找;None=关闭
+    :return <int,int> 目标点的X坐标，目标点的Y坐标(与color_first相同,从1开始,并以整张图片为坐标系)
+    """
+    array = image_array(image)
+    left, top = 0, 0
+    if box is not None:
+        left, top = max(box[0], 0), max(box[1], 0)
+        array = array[top:box[3], left:box[2]]
+    if stride is not None and stride > 1:
+        coarse = _color_first_in(array[::stride, ::stride], color, vague)
+        if coarse is not None:
+            limit = (coarse[0] + coarse[1]) * stride + 1  # 精确结果的x+y一定不大于抽样结果的x+y
+            array = array[:limit, :limit]
+    result = _color_first_in(array, color, vague)
+    if result is None:
+        return None
+    return result[0] + left + 1, result[1] + top + 1
+
+
+def _color_first_in(array, color, vague, size=64):
+    """ 在RGB数组中查找最靠近左上角的目标颜色点(color_first_array的查找过程)
+    :param array: <numpy.ndarray> 形状为(高,宽,3)的uint8数组
+    :param color: <int,int,int> 需要查找颜色的RGB值
+    :param vague: <int> 颜色模糊程度(RGB各通道允许误差量)
+    :param size: <int> 初始查找的正方形区域边长
+    :return <int,int> 目标点的X坐标，目标点的Y坐标(从0开始),未找到则返回None
+    """
+    height, width = array.shape[:2]
+    lower = np.array([max(code - vague, 0) for code in color], dtype=np.int16)
+    upper = np.array([min(code + vague, 255) for code in color], dtype=np.int16)
+    while True:
+        part = array[:size, :size]
+        match = ((part >= lower) & (part <= upper)).all(axis=2)
+        y_list, x_list = np.nonzero(match)
+        if len(x_list) > 0:
+            distance = x_list + y_list
+            best = np.lexsort((x_list, distance))[0]
+            # 所有x+y小于size的点都在当前区域内,或当前区域已经覆盖整个数组时,结果即为最终结果
+            if distance[best] < size or (size >= height and size >= width):
+                return int(x_list[best]), int(y_list[best])
+        elif size >= height and size >= width:
+            return None
+        size *= 2
+
+
 def photo_differ_small(img1, img2, size=12):
     """
     图片相关性比较(通过缩小图比较)
@@ -176,3 +437,43 @@ def dcy_background(picture, background):
             temp_multiply.putpixel((x, y), (m_r, m_g, m_b))  # 生成正片叠底图层
             temp_partition.putpixel((x, y), (p_r, p_g, p_b))  # 生成划分图层
     return Image.blend(temp_multiply, temp_partition, 0.5)
+
+
+@functools.lru_cache(maxsize=None)
+def dcy_table():
+    """ 窦式背景剔除法的查找表(由mixed_mode_partition,mixed_mode_difference,mixed_mode_multiply逐个计算)
+    划分图层与正片叠底图层写入图片时会被截断到0-255,再按Image.blend(alpha=0.5)的规则取两者之和的一半(向下取整)
+    :return: <numpy.ndarray> 形状为(256*256,)的uint8查找表,下标为:目标图通道值*256+背景图通道值
+    """
+    table = np.empty(256 * 256, dtype=np.uint8)
+    for s in range(256):
+        for b in range(256):
+            p = mixed_mode_partition(s, b)  # 图层-混合模式-划分
+            m = mixed_mode_multiply(p, mixed_mode_difference(s, b))  # 图层-混合模式-差值,正片叠底
+            table[s * 256 + b] = (min(max(m, 0), 255) + min(max(p, 0), 255)) // 2
+    table.flags.writeable = False
+    return table
+
+
+def dcy_background_array(picture, background, tile_height=None):
+    """ 窦式背景剔除法(NumPy数组实现,结果与dcy_background相同)
+    划分-差值-正片叠底-混合的计算过程整体合并为一张查找表,每个像素的每个通道只需查表一次
+    要求目标图和背景图的宽高完全相同
+    :param picture:(PIL.Image)目标图
+    :param background:(PIL.Image)背景图
+    :param tile_height:(int/None)分块处理时每块的高度(行数):None=整张图片一次处理,
+    int=每次只读取并计算tile_height行,内存占用不随图片大小增长(适合超大图片)
+    :return:(PIL.Image)剔除背景的图
+    """
+    width, height = picture.size
+    if background.size[0] != width or background.size[1] != height:
+        return None
+    table = dcy_table()
+    tile_height = height if tile_height is None else max(int(tile_height), 1)  # 每块至少1行
+    result = Image.new("RGB", picture.size)
+    for top in range(0, height, tile_height):
+        box = (0, top, width, min(top + tile_height, height))
+        s = image_array(picture.crop(box)).astype(np.intp)
+        b = image_array(background.crop(box))
+        result.paste(Image.fromarray(table[(s << 8) | b], "RGB"), box)
+    return result